@@ -1,19 +1,27 @@
 import ccxt
-import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.markets_cache import MarketsCache
+from common.publish import atomic_write_json
 
 DATA_DIR = "D:/Ilya/My project/FIW_soft/FIW_soft/Htx"
 
+# Общий с *_fetch_funding.py кэш рынков; --refresh-markets принудительно загружает рынки с биржи
+markets_cache = MarketsCache(f"{DATA_DIR}/markets_cache_htx.json")
+
 # Создаём экземпляр HTX Futures
 ex = ccxt.htx({
     'options': {
         'defaultType': 'swap',  # важно для фьючерсов
     },
-    'verify': False  # <- Временно отключаем проверку SSL
+    # SSL проверяется по сертификатам certifi (их использует requests), отключать проверку не нужно
 })
 
 # Загружаем рынки
 print("Загрузка рынков HTX Futures...")
-ex.load_markets()
+markets_cache.load_sync(ex, reload="--refresh-markets" in sys.argv)
 
 # Фильтруем: только perpetual (swap) и котировка USDT
 perp_symbols = [
@@ -28,7 +36,6 @@ print(f"Найдено {len(perp_symbols)} perpetual-пар с USDT котиро
 print("Примеры:", perp_symbols[:5])
 
 # Сохраняем в файл
-with open(f"{DATA_DIR}/tradePairsHtx.json", "w", encoding="utf-8") as f:
-    json.dump(perp_symbols, f, indent=4, ensure_ascii=False)
+atomic_write_json(f"{DATA_DIR}/tradePairsHtx.json", perp_symbols)
 
 print("\nСписок успешно сохранён в tradePairsHtx.json")
\ No newline at end of file
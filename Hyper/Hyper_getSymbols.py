@@ -1,10 +1,18 @@
 # hyper_getSymbols.py
 import ccxt
-import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.markets_cache import MarketsCache
+from common.publish import atomic_write_json
 
 # Путь к папке с данными Hyperliquid
 DATA_DIR = "D:/Ilya/My project/FIW_soft/FIW_soft/Hyper"
 
+# Общий с *_fetch_funding.py кэш рынков; --refresh-markets принудительно загружает рынки с биржи
+markets_cache = MarketsCache(f"{DATA_DIR}/markets_cache_hyper.json")
+
 # Создаём экземпляр Hyperliquid
 ex = ccxt.hyperliquid({
     'timeout': 30000,  # Увеличиваем таймаут до 30 секунд
@@ -12,7 +20,7 @@ ex = ccxt.hyperliquid({
 
 # Загружаем рынки
 print("Загрузка рынков Hyperliquid...")
-markets = ex.load_markets()
+markets = markets_cache.load_sync(ex, reload="--refresh-markets" in sys.argv)
 
 # Фильтруем: только perpetual (swap) контракты
 # У Hyperliquid часто используется формат BASE/USDC:USDC для perpetual
@@ -29,7 +37,6 @@ print("Примеры:", perp_symbols[:5])
 
 # Сохраняем в файл
 output_file_path = f"{DATA_DIR}/tradePairsHyper.json"
-with open(output_file_path, "w", encoding="utf-8") as f:
-    json.dump(perp_symbols, f, indent=4, ensure_ascii=False)
+atomic_write_json(output_file_path, perp_symbols)
 
 print(f"\nСписок успешно сохранён в {output_file_path}")
\ No newline at end of file
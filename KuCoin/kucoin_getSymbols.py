@@ -1,14 +1,22 @@
 import ccxt
-import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from common.markets_cache import MarketsCache
+from common.publish import atomic_write_json
 
 DATA_DIR = "D:/Ilya/My project/FIW_soft/FIW_soft/KuCoin"
 
+# Общий с *_fetch_funding.py кэш рынков; --refresh-markets принудительно загружает рынки с биржи
+markets_cache = MarketsCache(f"{DATA_DIR}/markets_cache_kucoin.json")
+
 # Создаём экземпляр KuCoin Futures
 ex = ccxt.kucoinfutures()
 
 # Загружаем рынки
 print("Загрузка рынков KuCoin Futures...")
-ex.load_markets()
+markets_cache.load_sync(ex, reload="--refresh-markets" in sys.argv)
 
 # Фильтруем: только perpetual (swap) и котировка USDT
 perp_symbols = [
@@ -23,7 +31,6 @@ print(f"Найдено {len(perp_symbols)} perpetual-пар с USDT котиро
 print("Примеры:", perp_symbols[:5])
 
 # Сохраняем в файл
-with open(f"{DATA_DIR}/tradePairsKuCoin.json", "w", encoding="utf-8") as f:
-    json.dump(perp_symbols, f, indent=4, ensure_ascii=False)
+atomic_write_json(f"{DATA_DIR}/tradePairsKuCoin.json", perp_symbols)
 
 print("\nСписок успешно сохранён в tradePairsKuCoin.json")
\ No newline at end of file
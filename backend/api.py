@@ -0,0 +1,128 @@
+import math
+
+from common.arbitrage import CURRENT_WINDOW, DEFAULT_ARBITRAGE_N, RANK_BY, arbitrage_table
+from common.coin_index import MATCH_MODES
+from common.top_index import ORDERS
+
+# Сколько записей /api/top отдаёт по умолчанию и максимум
+DEFAULT_TOP_N = 10
+MAX_TOP_N = 200
+
+
+# Тела ответов API, общие для Flask (app.py) и ASGI (asgi_app.py): (словарь, HTTP-статус)
+
+def search_payload(snapshot, coin_name: str, match: str = 'exact'):
+    """Поиск монеты по всем биржам через индекс снимка."""
+    if not coin_name:
+        return {'error': 'Coin name is required'}, 400
+    if match not in MATCH_MODES:
+        return {'error': f"match must be one of: {', '.join(MATCH_MODES)}"}, 400
+
+    # Поиск по индексу снимка: работа пропорциональна числу совпадений, а не всех пар
+    results = {
+        exchange: {pair: snapshot.data[exchange][pair] for pair in pairs}
+        for exchange, pairs in snapshot.index.search(coin_name, match).items()
+    }
+    return {
+        'coin': coin_name,
+        'match': match,
+        'results': results,
+        'total_matches': sum(len(matches) for matches in results.values())
+    }, 200
+
+
+def _optional_float(args, name):
+    """Необязательный числовой параметр запроса; nan и inf — такая же ошибка (ValueError), как нечисло."""
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be finite")
+    return number
+
+
+def top_payload(snapshot, args):
+    """
+    Топ-N пар по окну фандинга из отсортированных индексов снимка.
+    args — параметры запроса: window (по умолчанию 24h), exchange, n, order=desc|asc,
+    min_ask_volume, min_bid_volume, interval (часы между выплатами).
+    """
+    window = args.get('window', '24h')
+    if window not in snapshot.top.by_window:
+        return {'error': f"window must be one of: {', '.join(snapshot.top.windows)}"}, 400
+    exchange = args.get('exchange') or None
+    if exchange is not None and exchange not in snapshot.data:
+        return {'error': f"Unknown exchange: {exchange}"}, 400
+    order = args.get('order', 'desc')
+    if order not in ORDERS:
+        return {'error': f"order must be one of: {', '.join(ORDERS)}"}, 400
+    try:
+        n = int(args.get('n', DEFAULT_TOP_N))
+        min_ask_volume = _optional_float(args, 'min_ask_volume')
+        min_bid_volume = _optional_float(args, 'min_bid_volume')
+        interval = _optional_float(args, 'interval')
+    except ValueError:
+        return {'error': 'n, min_ask_volume, min_bid_volume and interval must be numbers'}, 400
+    if not 1 <= n <= MAX_TOP_N:
+        return {'error': f"n must be between 1 and {MAX_TOP_N}"}, 400
+
+    top = snapshot.top.top(window, n, exchange, order, min_ask_volume, min_bid_volume, interval)
+    return {
+        'window': window,
+        'exchange': exchange,
+        'order': order,
+        'results': [
+            {'rank': rank, 'exchange': entry_exchange, 'symbol': pair, 'value': value,
+             'data': snapshot.data[entry_exchange][pair]}
+            for rank, (value, entry_exchange, pair) in enumerate(top, start=1)
+        ],
+        'total': len(top)
+    }, 200
+
+
+def arbitrage_payload(snapshot, args):
+    """
+    Лучшие пары long/short между биржами по активам в окне.
+    args — параметры запроса: window (24h, ... или current), n, by=spread|profit, min_volume.
+    Соединение бирж по активу — готовый индекс снимка, запрос стоит O(число символов).
+    """
+    window = args.get('window', '24h')
+    windows = [*snapshot.top.windows, CURRENT_WINDOW]
+    if window not in windows:
+        return {'error': f"window must be one of: {', '.join(windows)}"}, 400
+    by = args.get('by', 'spread')
+    if by not in RANK_BY:
+        return {'error': f"by must be one of: {', '.join(RANK_BY)}"}, 400
+    try:
+        n = int(args.get('n', DEFAULT_ARBITRAGE_N))
+        min_volume = _optional_float(args, 'min_volume')
+    except ValueError:
+        return {'error': 'n and min_volume must be numbers'}, 400
+    if not 1 <= n <= MAX_TOP_N:
+        return {'error': f"n must be between 1 and {MAX_TOP_N}"}, 400
+
+    rows = arbitrage_table(snapshot.data, window, n, by, min_volume, by_asset=snapshot.index.by_base,
+                           registry=snapshot.registry)
+    return {
+        'window': window,
+        'by': by,
+        'results': rows,
+        'total': len(rows)
+    }, 200
+
+
+def exchanges_payload(snapshot):
+    return {
+        'exchanges': list(snapshot.data.keys()),
+        'total_exchanges': len(snapshot.data)
+    }, 200
+
+
+def health_payload(snapshot):
+    return {
+        'status': 'healthy',
+        'loaded_exchanges': len(snapshot.data),
+        'snapshot_generation': snapshot.generation,
+        'snapshot_loaded_at': snapshot.loaded_at
+    }, 200
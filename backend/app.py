@@ -1,86 +1,76 @@
-from flask import Flask, jsonify, request
+import sys
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
-import json
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from api import arbitrage_payload, exchanges_payload, health_payload, search_payload, top_payload
+from http_cache import SnapshotResponseCache
+from settings import EXCHANGE_DATA_FILES, SYMBOL_REGISTRY_FILE
+from snapshot_store import SnapshotStore
+
 app = Flask(__name__)
 CORS(app)  # Это заменит ваш @app.after_request код
 
-# Определяем путь к проекту FIW_soft
-BASE_DIR = Path("D:/Ilya/My project/FIW_soft/FIW_soft")
-
-# Словарь: имя биржи -> путь к файлу с результатами
-EXCHANGE_DATA_FILES = {
-    'Gate': BASE_DIR / 'Gate' / 'funding_results_gate.json',
-    'KuCoin': BASE_DIR / 'KuCoin' / 'funding_results_kucoin.json',
-    'Mexc': BASE_DIR / 'Mexc' / 'funding_results_mexc.json',
-    'Hyper': BASE_DIR / 'Hyper' / 'funding_results_hyper.json',
-    'HTX': BASE_DIR / 'HTX' / 'funding_results_htx.json',
-    'Bybit': BASE_DIR / 'Bybite' / 'funding_results_bybite.json',
-    'BingX': BASE_DIR / 'BingX' / 'funding_results_bingx.json',
-}
-
-# Загружаем все данные один раз при старте
-ALL_EXCHANGE_DATA = {}
+# Текущий снимок данных всех бирж; фоновый поток подменяет его при изменении файлов
+store = SnapshotStore(EXCHANGE_DATA_FILES, registry_file=SYMBOL_REGISTRY_FILE)
+# ETag/Last-Modified по версии снимка, 304, Cache-Control и сжатие ответов
+response_cache = SnapshotResponseCache(store)
 
 def load_exchange_data():
-    """Загружает данные всех бирж в память при старте сервера."""
+    """Загружает данные всех бирж в память и запускает слежение за файлами результатов."""
     print("Загрузка данных с бирж...")
-    for exchange, file_path in EXCHANGE_DATA_FILES.items():
-        if not file_path.exists():
-            print(f"[ПРЕДУПРЕЖДЕНИЕ] Файл для {exchange} не найден: {file_path}")
-            ALL_EXCHANGE_DATA[exchange] = {}
-            continue
-
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                ALL_EXCHANGE_DATA[exchange] = data
-            print(f"  - {exchange}: загружено {len(data)} записей.")
-        except json.JSONDecodeError:
-            print(f"[ОШИБКА] Невозможно прочитать JSON файл для {exchange}: {file_path}")
-            ALL_EXCHANGE_DATA[exchange] = {}
-        except Exception as e:
-            print(f"[ОШИБКА] Проблема с файлом {exchange}: {e}")
-            ALL_EXCHANGE_DATA[exchange] = {}
+    store.refresh()
+    store.start()
     print("Загрузка завершена.\n")
 
 @app.route('/api/search/<coin_name>', methods=['GET'])
+@response_cache.cached
 def search_coin(coin_name):
     """
-    API endpoint для поиска монеты по всем биржам
+    API endpoint для поиска монеты по всем биржам.
+    ?match=exact (по умолчанию) — базовый актив целиком, prefix — по началу, fuzzy — подстрока актива.
     """
-    if not coin_name:
-        return jsonify({'error': 'Coin name is required'}), 400
-    
-    results = {}
-    coin_name_upper = coin_name.upper()
+    payload, status = search_payload(g.snapshot, coin_name, request.args.get('match', 'exact'))
+    return jsonify(payload), status
 
-    for exchange, data in ALL_EXCHANGE_DATA.items():
-        # Ищем пары, содержащие coin_name (регистронезависимо)
-        matches = {pair: info for pair, info in data.items() if coin_name_upper in pair.upper()}
-        
-        if matches:
-            results[exchange] = matches
+@app.route('/api/top', methods=['GET'])
+@response_cache.cached
+def top_pairs():
+    """
+    API endpoint для топ-N пар по окну фандинга.
+    ?window=24h&exchange=Gate&n=10&order=desc&min_ask_volume=...&min_bid_volume=...&interval=8
+    """
+    payload, status = top_payload(g.snapshot, request.args)
+    return jsonify(payload), status
 
-    return jsonify({
-        'coin': coin_name,
-        'results': results,
-        'total_matches': sum(len(matches) for matches in results.values())
-    })
+@app.route('/api/arbitrage', methods=['GET'])
+@response_cache.cached
+def arbitrage():
+    """
+    API endpoint для межбиржевого арбитража фандинга: лучшая пара long/short по каждому активу.
+    ?window=24h|...|current&n=20&by=spread|profit&min_volume=...
+    """
+    payload, status = arbitrage_payload(g.snapshot, request.args)
+    return jsonify(payload), status
 
 @app.route('/api/exchanges', methods=['GET'])
+@response_cache.cached
 def get_exchanges():
     """API endpoint для получения списка доступных бирж"""
-    return jsonify({
-        'exchanges': list(ALL_EXCHANGE_DATA.keys()),
-        'total_exchanges': len(ALL_EXCHANGE_DATA)
-    })
+    payload, status = exchanges_payload(g.snapshot)
+    return jsonify(payload), status
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """API endpoint для проверки работы сервера"""
-    return jsonify({'status': 'healthy', 'loaded_exchanges': len(ALL_EXCHANGE_DATA)})
+    """
+    API endpoint для проверки работы сервера.
+    Без кэша ответов: generation и loaded_at меняются при перезагрузке, даже если файлы (и ETag) те же.
+    """
+    payload, status = health_payload(store.current)
+    response = jsonify(payload)
+    response.headers['Cache-Control'] = 'no-store'
+    return response, status
 
 if __name__ == '__main__':
     # Загружаем данные при запуске сервера
@@ -90,6 +80,10 @@ if __name__ == '__main__':
     print("Available endpoints:")
     print("  GET /api/health - Health check")
     print("  GET /api/exchanges - List of exchanges")
-    print("  GET /api/search/<coin_name> - Search coin across all exchanges")
+    print("  GET /api/search/<coin_name>?match=exact|prefix|fuzzy - Search coin across all exchanges")
+    print("  GET /api/top?window=24h&exchange=&n=10&order=desc&min_ask_volume=&min_bid_volume=&interval= - Top pairs by window")
+    print("  GET /api/arbitrage?window=24h&n=20&by=spread|profit&min_volume= - Cross-exchange funding arbitrage")
+    
+    print("Production-режим (ASGI, несколько воркеров): python serve_asgi.py --workers 4")
     
     app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
@@ -0,0 +1,103 @@
+import json
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from api import arbitrage_payload, exchanges_payload, health_payload, search_payload, top_payload
+from http_cache import BodyCache, cache_headers, is_not_modified, negotiate_encoding
+from settings import EXCHANGE_DATA_FILES, SYMBOL_REGISTRY_FILE
+from snapshot_store import SnapshotStore
+
+# Те же маршруты, что в app.py, для production-режима под uvicorn (serve_asgi.py).
+# Каждый воркер — отдельный процесс со своим SnapshotStore и своим кэшем тел ответов.
+store = SnapshotStore(EXCHANGE_DATA_FILES, registry_file=SYMBOL_REGISTRY_FILE)
+bodies = BodyCache()
+
+
+def render(key, build, snapshot, encoding):
+    """Сборка тела: build, json.dumps и сжатие. Возвращает (тело, сжатие, статус); ошибки не кэшируются."""
+    payload, status = build(snapshot)
+    body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    if status != 200:
+        return body, None, status
+    return (*bodies.put(key, body, encoding), status)
+
+
+async def snapshot_response(request, build):
+    """
+    Ответ по текущему снимку с теми же правилами, что SnapshotResponseCache во Flask:
+    304 на условные запросы, кэш готовых тел по (etag, путь, сжатие), ошибки не кэшируются.
+    build(snapshot) возвращает (словарь, статус). 304 и готовое тело из кэша отдаются сразу,
+    а сборка нового тела идёт в пуле потоков, чтобы не блокировать event loop.
+    """
+    snapshot = store.current
+    headers = request.headers
+    if is_not_modified(snapshot, headers.get('if-none-match'), headers.get('if-modified-since')):
+        return Response(status_code=304, headers=cache_headers(snapshot))
+
+    encoding = negotiate_encoding(headers.get('accept-encoding', ''))
+    full_path = f"{request.url.path}?{request.url.query}"
+    key = (snapshot.etag, full_path, encoding)
+    cached = bodies.get(key)
+    if cached is None:
+        body, body_encoding, status = await run_in_threadpool(render, key, build, snapshot, encoding)
+        if status != 200:
+            return Response(body, status_code=status, media_type='application/json')
+    else:
+        body, body_encoding = cached
+    return Response(body, media_type='application/json', headers=cache_headers(snapshot, body_encoding))
+
+
+async def search_coin(request):
+    coin_name = request.path_params['coin_name']
+    match = request.query_params.get('match', 'exact')
+    return await snapshot_response(request, lambda snapshot: search_payload(snapshot, coin_name, match))
+
+
+async def top_pairs(request):
+    return await snapshot_response(request, lambda snapshot: top_payload(snapshot, request.query_params))
+
+
+async def arbitrage(request):
+    return await snapshot_response(request, lambda snapshot: arbitrage_payload(snapshot, request.query_params))
+
+
+async def get_exchanges(request):
+    return await snapshot_response(request, exchanges_payload)
+
+
+async def health_check(request):
+    # Без кэша ответов и ETag: generation и loaded_at меняются при перезагрузке, даже если файлы те же
+    payload, status = health_payload(store.current)
+    return Response(json.dumps(payload, separators=(',', ':')), status_code=status,
+                    media_type='application/json', headers={'Cache-Control': 'no-store'})
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Загружаем данные в каждом воркере и следим за файлами в фоновом потоке
+    store.refresh()
+    store.start()
+    yield
+    store.stop()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/search/{coin_name}', search_coin, methods=['GET']),
+        Route('/api/top', top_pairs, methods=['GET']),
+        Route('/api/arbitrage', arbitrage, methods=['GET']),
+        Route('/api/exchanges', get_exchanges, methods=['GET']),
+        Route('/api/health', health_check, methods=['GET']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'])],
+    lifespan=lifespan,
+)
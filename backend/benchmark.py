@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+# Нагрузочный тест API: N запросов с заданной параллельностью, итог — запросов в секунду и перцентили задержки.
+# Пример: python benchmark.py http://127.0.0.1:8000/api/search/BTC --requests 5000 --concurrency 64
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(url, total, concurrency, headers):
+    latencies = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(session):
+        nonlocal errors
+        for _ in counter:
+            start = time.perf_counter()
+            try:
+                async with session.get(url, headers=headers) as resp:
+                    await resp.read()
+                    if resp.status >= 400:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{url}")
+    print(f"  запросов: {len(latencies)}, ошибок: {errors}, время: {elapsed:.2f} с")
+    print(f"  пропускная способность: {len(latencies) / elapsed:.0f} запр/с")
+    print(f"  задержка p50/p95/p99: {percentile(latencies, 50) * 1000:.1f} / "
+          f"{percentile(latencies, 95) * 1000:.1f} / {percentile(latencies, 99) * 1000:.1f} мс")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API")
+    parser.add_argument("url")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--gzip", action="store_true", help="Отправлять Accept-Encoding: gzip")
+    args = parser.parse_args()
+
+    headers = {'Accept-Encoding': 'gzip' if args.gzip else 'identity'}
+    asyncio.run(run(args.url, args.requests, args.concurrency, headers))
@@ -0,0 +1,140 @@
+import gzip
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from werkzeug.datastructures import ETags
+from werkzeug.http import http_date, parse_date, parse_etags
+
+try:
+    import brotli  # Необязательно: без него отдаём gzip
+except ImportError:
+    brotli = None
+
+# Ответы меньше этого размера не сжимаем: заголовки и CPU дороже выигрыша
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# Сколько готовых (сериализованных и сжатых) ответов держать в памяти
+RESPONSE_CACHE_SIZE = 256
+# Клиент может хранить ответ, но перед использованием обязан спросить сервер (If-None-Match → 304)
+CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+
+def negotiate_encoding(accept_encoding: str):
+    """Выбирает сжатие по заголовку Accept-Encoding: br (если установлен brotli), затем gzip, иначе без сжатия."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress(body: bytes, encoding: str):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def is_not_modified(snapshot, if_none_match: str = None, if_modified_since: str = None):
+    """Условный запрос совпадает с текущим снимком (по сырым значениям заголовков) — можно ответить 304."""
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return isinstance(etags, ETags) and etags.contains_weak(snapshot.etag)
+    if if_modified_since:
+        since = parse_date(if_modified_since)
+        return since is not None and int(snapshot.last_modified) <= since.timestamp()
+    return False
+
+
+def cache_headers(snapshot, encoding: str = None):
+    """Заголовки кэширования для ответа по снимку."""
+    headers = {
+        'ETag': f'W/"{snapshot.etag}"',  # Слабый: одно содержимое в разных сжатиях
+        'Last-Modified': http_date(snapshot.last_modified),
+        'Cache-Control': CACHE_CONTROL,
+        'Vary': 'Accept-Encoding',
+    }
+    if encoding is not None:
+        headers['Content-Encoding'] = encoding
+    return headers
+
+
+class BodyCache:
+    """
+    Готовые тела ответов по ключу (etag снимка, путь с параметрами, сжатие), LRU.
+    Пока снимок не сменился, повторный запрос не сериализует и не сжимает JSON заново.
+    """
+
+    def __init__(self, size: int = RESPONSE_CACHE_SIZE):
+        self.size = size
+        self.bodies = OrderedDict()  # ключ -> (тело, сжатие)
+        self.lock = threading.Lock()  # Запросы обслуживаются в нескольких потоках
+
+    def get(self, key):
+        with self.lock:
+            cached = self.bodies.get(key)
+            if cached is not None:
+                self.bodies.move_to_end(key)
+            return cached
+
+    def put(self, key, body: bytes, encoding: str):
+        """Сжимает тело (если оно не слишком мало), кладёт в кэш и возвращает (тело, сжатие)."""
+        if len(body) < MIN_COMPRESS_BYTES:
+            encoding = None
+        cached = (compress(body, encoding), encoding)
+        with self.lock:
+            self.bodies[key] = cached
+            if len(self.bodies) > self.size:
+                self.bodies.popitem(last=False)
+        return cached
+
+
+class SnapshotResponseCache:
+    """
+    HTTP-кэширование ответов Flask, которые зависят только от текущего снимка данных:
+    ETag и Last-Modified из снимка, 304 на условные запросы, Cache-Control,
+    сжатие gzip/brotli по Accept-Encoding и кэш готовых тел ответов.
+    Снимок, по которому строится ответ, маршрут получает из flask.g.snapshot.
+    """
+
+    def __init__(self, store, size: int = RESPONSE_CACHE_SIZE):
+        self.store = store
+        self.bodies = BodyCache(size)
+
+    def cached(self, view):
+        """Декоратор маршрута Flask."""
+        from flask import Response, g, make_response, request
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            snapshot = self.store.current
+            if is_not_modified(snapshot, request.headers.get('If-None-Match'), request.headers.get('If-Modified-Since')):
+                return Response(status=304, headers=cache_headers(snapshot))
+
+            encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+            key = (snapshot.etag, request.full_path, encoding)
+            cached = self.bodies.get(key)
+            if cached is None:
+                g.snapshot = snapshot
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response  # Ошибки не кэшируем и не помечаем версией снимка
+                cached = self.bodies.put(key, response.get_data(), encoding)
+
+            body, body_encoding = cached
+            return Response(body, mimetype='application/json', headers=cache_headers(snapshot, body_encoding))
+
+        return wrapper
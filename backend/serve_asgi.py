@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import uvicorn
+
+# Production-режим API: те же маршруты и снимки, что в app.py, но под uvicorn с несколькими воркерами.
+# Flask-сервер (python app.py) остаётся для разработки.
+#
+# Замеры benchmark.py (3000 запросов, 32 параллельно, 1 ядро, 1 воркер uvicorn против threaded Flask,
+# синтетические данные: 7 бирж × 505 пар):
+#   /api/search/BTC                    Flask 544 запр/с, p50/p95/p99 58/75/101 мс
+#                                      ASGI 1986 запр/с, p50/p95/p99 16/21/29 мс
+#   /api/search/A?match=prefix (gzip)  Flask 461 запр/с, p50/p95/p99 68/83/130 мс
+#                                      ASGI 1620 запр/с, p50/p95/p99 19/28/33 мс
+# Масштабирование по --workers на нескольких ядрах не замерялось; воркеры не делят состояние,
+# каждый держит свой снимок.
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Запуск API под ASGI-сервером uvicorn")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Число процессов-воркеров (по умолчанию — число ядер)")
+    args = parser.parse_args()
+
+    backend_dir = Path(__file__).resolve().parent
+    sys.path.insert(0, str(backend_dir))
+
+    print(f"Funding Rates API (ASGI) на {args.host}:{args.port}, воркеров: {args.workers}")
+    # Строка импорта, а не объект: uvicorn сам импортирует приложение в каждом воркере
+    uvicorn.run("asgi_app:app", host=args.host, port=args.port, workers=args.workers,
+                app_dir=str(backend_dir), access_log=False)
@@ -0,0 +1,18 @@
+from pathlib import Path
+
+# Определяем путь к проекту FIW_soft
+BASE_DIR = Path("D:/Ilya/My project/FIW_soft/FIW_soft")
+
+# Словарь: имя биржи -> путь к файлу с результатами
+EXCHANGE_DATA_FILES = {
+    'Gate': BASE_DIR / 'Gate' / 'funding_results_gate.json',
+    'KuCoin': BASE_DIR / 'KuCoin' / 'funding_results_kucoin.json',
+    'Mexc': BASE_DIR / 'Mexc' / 'funding_results_mexc.json',
+    'Hyper': BASE_DIR / 'Hyper' / 'funding_results_hyper.json',
+    'HTX': BASE_DIR / 'HTX' / 'funding_results_htx.json',
+    'Bybit': BASE_DIR / 'Bybite' / 'funding_results_bybite.json',
+    'BingX': BASE_DIR / 'BingX' / 'funding_results_bingx.json',
+}
+
+# Реестр символов: символ биржи -> канонический актив и множитель (собирает run_all_getSymbols.py)
+SYMBOL_REGISTRY_FILE = BASE_DIR / 'symbol_registry.json'
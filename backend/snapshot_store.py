@@ -0,0 +1,152 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+from common.coin_index import CoinIndex
+from common.symbol_registry import SymbolRegistry
+from common.top_index import TopIndex
+
+# Как часто фоновый поток проверяет файлы результатов, секунд
+POLL_INTERVAL_SECONDS = 2.0
+# Ключ версии реестра символов среди markers снимка (входит в ETag)
+REGISTRY_MARKER = 'symbol_registry'
+
+
+class Snapshot:
+    """
+    Неизменяемый снимок данных всех бирж. Обработчики запросов берут ссылку на текущий снимок
+    один раз и работают только с ней — данные внутри снимка после публикации не меняются.
+    """
+
+    def __init__(self, data: dict, markers: dict, generation: int, last_modified: float = None, registry=None):
+        self.data = data  # {биржа: {пара: запись}}
+        self.registry = registry  # Реестр символов: канонический актив и множитель пары
+        self.index = CoinIndex(data, registry)  # Поиск монет строится один раз на снимок, в фоновом потоке
+        self.top = TopIndex(data)  # Отсортированные списки по окнам для /api/top — тоже один раз на снимок
+        self.markers = markers  # {биржа: версия из *.latest.json или (mtime, size) файла}
+        self.generation = generation  # Растёт на 1 при каждой замене снимка
+        self.loaded_at = time.time()
+        # Время изменения самого свежего файла — для Last-Modified
+        self.last_modified = last_modified if last_modified is not None else self.loaded_at
+        # ETag по версиям файлов, а не по generation: не меняется при перезапуске сервера на тех же данных
+        self.etag = hashlib.sha1(repr(sorted(markers.items())).encode('utf-8')).hexdigest()[:16]
+
+
+class SnapshotStore:
+    """
+    Хранилище снимков с горячей перезагрузкой.
+    Фоновый поток следит за файлами funding_results_*.json (по указателю *.latest.json,
+    а если его нет — по mtime и размеру), разбирает изменившиеся файлы и подменяет
+    снимок одним присваиванием self.current. Потоки запросов не ждут разбора JSON
+    и никогда не видят наполовину обновлённые данные.
+    """
+
+    def __init__(self, files: dict, poll_interval: float = POLL_INTERVAL_SECONDS, registry_file=None):
+        self.files = {exchange: Path(path) for exchange, path in files.items()}
+        self.poll_interval = poll_interval
+        # Реестр символов перечитывается, когда его пересоберёт run_all_getSymbols.py
+        self.registry_file = Path(registry_file) if registry_file is not None else None
+        self.current = Snapshot({exchange: {} for exchange in self.files}, {}, 0)
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _pointer_path(path: Path):
+        return path.with_name(f"{path.stem}.latest.json")
+
+    def _read_pointer(self, path: Path):
+        try:
+            with open(self._pointer_path(path), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _marker(self, path: Path):
+        """Признак версии файла: номер снимка из указателя или (mtime, size); None — файла нет."""
+        pointer = self._read_pointer(path)
+        if pointer is not None:
+            return ('version', pointer['version'])
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return ('mtime', stat.st_mtime_ns, stat.st_size)
+
+    def _load_file(self, path: Path):
+        """Читает данные биржи: неизменяемый снимок по указателю, иначе сам файл."""
+        pointer = self._read_pointer(path)
+        if pointer is not None:
+            path = path.parent / pointer['path']
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def refresh(self):
+        """Перечитывает изменившиеся файлы и публикует новый снимок. Возвращает True, если снимок сменился."""
+        snapshot = self.current
+        data = dict(snapshot.data)
+        markers = dict(snapshot.markers)
+        registry = snapshot.registry
+        changed = []
+
+        if self.registry_file is not None:
+            marker = self._marker(self.registry_file)
+            if REGISTRY_MARKER not in markers or marker != markers[REGISTRY_MARKER]:
+                if marker is None:
+                    print(f"[ПРЕДУПРЕЖДЕНИЕ] Реестр символов не найден: {self.registry_file}, активы — по символам")
+                registry = SymbolRegistry.load(self.registry_file) if marker is not None else None
+                markers[REGISTRY_MARKER] = marker
+                changed.append(REGISTRY_MARKER)
+
+        for exchange, path in self.files.items():
+            marker = self._marker(path)
+            if exchange in snapshot.markers and marker == snapshot.markers[exchange]:
+                continue
+            if marker is None:
+                print(f"[ПРЕДУПРЕЖДЕНИЕ] Файл для {exchange} не найден: {path}")
+                data[exchange] = {}
+                markers[exchange] = None
+                changed.append(exchange)
+                continue
+            try:
+                data[exchange] = self._load_file(path)
+            except json.JSONDecodeError:
+                # Старые данные остаются; файл перечитаем на следующей проверке
+                print(f"[ОШИБКА] Невозможно прочитать JSON файл для {exchange}: {path}")
+                continue
+            except Exception as e:
+                print(f"[ОШИБКА] Проблема с файлом {exchange}: {e}")
+                continue
+            markers[exchange] = marker
+            changed.append(exchange)
+            print(f"  - {exchange}: загружено {len(data[exchange])} записей.")
+
+        if not changed:
+            return False
+        watched = [*self.files.values(), *([self.registry_file] if self.registry_file is not None else [])]
+        mtimes = [path.stat().st_mtime for path in watched if path.exists()]
+        # Двойная буферизация: новый снимок собран целиком, подмена — одно присваивание ссылки
+        self.current = Snapshot(data, markers, snapshot.generation + 1, max(mtimes) if mtimes else None, registry)
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self.refresh():
+                    print(f"Данные обновлены, снимок #{self.current.generation}")
+            except Exception as e:
+                print(f"[ОШИБКА] Обновление снимка не удалось: {e}")
+
+    def start(self):
+        """Запускает фоновый поток слежения за файлами."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._watch, name="snapshot-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
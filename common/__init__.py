@@ -0,0 +1 @@
+# common — общий код для скриптов бирж (папка исключается из обхода в run_all_*.py)
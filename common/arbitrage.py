@@ -0,0 +1,151 @@
+# arbitrage.py — межбиржевой арбитраж фандинга: лучшая пара long/short по каждому активу и окну
+
+import heapq
+
+from common.coin_index import base_asset
+from common.top_index import window_hours, window_keys
+
+# Псевдо-окно: текущий FR, приведённый к 24 часам по интервалу выплат биржи
+CURRENT_WINDOW = 'current'
+CURRENT_HORIZON_HOURS = 24
+RANK_BY = ('spread', 'profit')
+DEFAULT_ARBITRAGE_N = 20
+
+
+def join_by_asset(all_results: dict, registry=None):
+    """
+    Хэш-соединение всех бирж по активу: {актив: [(биржа, symbol), ...]} за один проход.
+    С реестром символов актив канонический (1000PEPE на Bybit и kPEPE на Hyperliquid — это PEPE).
+    """
+    by_asset = {}
+    for exchange, data in all_results.items():
+        for symbol in data:
+            asset = registry.asset(exchange, symbol) if registry is not None else base_asset(symbol)
+            by_asset.setdefault(asset, []).append((exchange, symbol))
+    return by_asset
+
+
+def arbitrage_windows(all_results: dict):
+    """Окна из данных ('24h', ..., по возрастанию) и текущий FR."""
+    windows = set()
+    for data in all_results.values():
+        for record in data.values():
+            windows.update(window_keys(record))
+    return [*sorted(windows, key=window_hours), CURRENT_WINDOW]
+
+
+def venue_value(record: dict, window: str):
+    """
+    Значение FR биржи для сравнения между биржами, в %.
+    Накопленные суммы по окну уже не зависят от интервала (в окно попадают все выплаты);
+    текущий FR — за одну выплату, поэтому приводится к 24 часам: FR × 24 / интервал.
+    """
+    if window == CURRENT_WINDOW:
+        current, interval = record.get('currentFR'), record.get('fundingIntervalHours')
+        if current is None or not interval:
+            return None
+        return current * CURRENT_HORIZON_HOURS / interval
+    value = record.get(window)
+    return value if isinstance(value, (int, float)) else None
+
+
+def best_pair(venues, all_results: dict, window: str, min_volume: float = None, registry=None):
+    """
+    Лучшая пара для актива: short там, где FR выше всего (шорт получает фандинг),
+    long там, где ниже всего, на разных биржах. Ёмкость сделки ограничена ликвидностью ног:
+    лонг покупает по аскам, шорт продаёт в биды. O(число бирж актива).
+    """
+    longs = {}  # биржа -> (значение, symbol, запись) с наименьшим FR
+    shorts = {}  # биржа -> с наибольшим FR
+    for exchange, symbol in venues:
+        record = all_results[exchange][symbol]
+        value = venue_value(record, window)
+        if value is None:
+            continue
+        if min_volume is None or (record.get('askTotalVolume') or 0) >= min_volume:
+            if exchange not in longs or value < longs[exchange][0]:
+                longs[exchange] = (value, symbol, record)
+        if min_volume is None or (record.get('bidTotalVolume') or 0) >= min_volume:
+            if exchange not in shorts or value > shorts[exchange][0]:
+                shorts[exchange] = (value, symbol, record)
+    if not longs or not shorts:
+        return None
+
+    long_exchange = min(longs, key=lambda exchange: longs[exchange][0])
+    short_exchange = max(shorts, key=lambda exchange: shorts[exchange][0])
+    if long_exchange == short_exchange:
+        # Лучшие ноги на одной бирже: берём лучший из вариантов с заменой одной ноги
+        candidates = []
+        other_shorts = [exchange for exchange in shorts if exchange != long_exchange]
+        other_longs = [exchange for exchange in longs if exchange != short_exchange]
+        if other_shorts:
+            candidates.append((long_exchange, max(other_shorts, key=lambda exchange: shorts[exchange][0])))
+        if other_longs:
+            candidates.append((min(other_longs, key=lambda exchange: longs[exchange][0]), short_exchange))
+        if not candidates:
+            return None
+        long_exchange, short_exchange = max(candidates, key=lambda pair: shorts[pair[1]][0] - longs[pair[0]][0])
+
+    long_value, long_symbol, long_record = longs[long_exchange]
+    short_value, short_symbol, short_record = shorts[short_exchange]
+    spread = short_value - long_value
+    capacity = min(long_record.get('askTotalVolume') or 0, short_record.get('bidTotalVolume') or 0)
+    return {
+        'window': window,
+        'spread': round(spread, 6),
+        'capacity': round(capacity, 2),
+        'expectedProfit': round(spread / 100 * capacity, 2),  # В валюте котировки за окно при объёме capacity
+        'long': _leg(long_exchange, long_symbol, long_value, long_record, registry),
+        'short': _leg(short_exchange, short_symbol, short_value, short_record, registry),
+        'venues': len({exchange for exchange, _ in venues}),
+    }
+
+
+def _leg(exchange: str, symbol: str, value: float, record: dict, registry=None):
+    return {
+        'exchange': exchange,
+        'symbol': symbol,
+        # Монет в одной единице символа (1000PEPE — 1000 PEPE): ноги уравниваются по числу монет
+        'multiplier': registry.resolve(exchange, symbol)[1] if registry is not None else 1,
+        'value': round(value, 6),
+        'fundingIntervalHours': record.get('fundingIntervalHours'),
+        'askTotalVolume': record.get('askTotalVolume'),
+        'bidTotalVolume': record.get('bidTotalVolume'),
+    }
+
+
+def arbitrage_table(all_results: dict, window: str = '24h', n: int = DEFAULT_ARBITRAGE_N, by: str = 'spread',
+                    min_volume: float = None, by_asset: dict = None, registry=None):
+    """
+    Топ-n активов по спреду (или ожидаемой прибыли) в окне window: [{'asset', ...best_pair}, ...].
+    by_asset — готовое соединение {актив: [(биржа, symbol)]} (например, CoinIndex.by_base снимка);
+    без него соединение строится здесь (по реестру символов registry, если он задан).
+    Всё вместе — O(число символов всех бирж).
+    """
+    if by not in RANK_BY:
+        raise ValueError(f"by должен быть одним из: {', '.join(RANK_BY)}")
+    if by_asset is None:
+        by_asset = join_by_asset(all_results, registry)
+    key = 'spread' if by == 'spread' else 'expectedProfit'
+
+    rows = []
+    for asset, venues in by_asset.items():
+        if len(venues) < 2:
+            continue
+        pair = best_pair(venues, all_results, window, min_volume, registry)
+        if pair is not None:
+            rows.append({'asset': asset, **pair})
+    return heapq.nlargest(n, rows, key=lambda row: row[key])
+
+
+def print_arbitrage_table(title: str, rows):
+    print(f"\n{title}:")
+    print("-" * 130)
+    print(f"{'Актив':<10} | {'Long':<22} | {'FR long':>10} | {'Short':<22} | {'FR short':>10} | {'Спред':>9} | {'Ёмкость':>12} | {'Прибыль':>10}")
+    print("-" * 130)
+    for row in rows:
+        long, short = row['long'], row['short']
+        long_name = f"{long['exchange']} ({long['fundingIntervalHours'] or '?'}ч)"
+        short_name = f"{short['exchange']} ({short['fundingIntervalHours'] or '?'}ч)"
+        print(f"{row['asset']:<10} | {long_name:<22} | {long['value']:>9.4f}% | {short_name:<22} | {short['value']:>9.4f}% | "
+              f"{row['spread']:>8.4f}% | {row['capacity']:>12.2f} | {row['expectedProfit']:>10.2f}")
@@ -0,0 +1,69 @@
+# bulk.py — пакетные запросы к биржам (один вызов на весь список символов)
+
+
+async def fetch_funding_snapshot(exchange, symbols, guard):
+    """
+    Получает текущий funding rate сразу для всех символов одним запросом
+    (fetch_funding_rates), если биржа это поддерживает.
+    Возвращает словарь {symbol: данные ccxt}. Символы, которых нет в словаре,
+    нужно запрашивать по одному через fetch_funding_rate.
+    """
+    if not exchange.has.get('fetchFundingRates'):
+        print(f"{exchange.id}: пакетный запрос funding rate не поддерживается, запрашиваем по символам")
+        return {}
+
+    try:
+        rates = await guard.call('funding_rates', exchange.fetch_funding_rates, symbols)
+    except Exception as e:
+        print(f"{exchange.id}: ошибка пакетного запроса funding rate, запрашиваем по символам: {e}")
+        return {}
+
+    wanted = set(symbols)
+    snapshot = {symbol: data for symbol, data in rates.items() if symbol in wanted}
+    print(f"{exchange.id}: пакетно получен текущий FR для {len(snapshot)}/{len(symbols)} символов")
+    return snapshot
+
+
+async def filter_liquid_symbols(exchange, symbols, guard, min_quote_volume: float = None):
+    """
+    Предварительный фильтр ликвидности по пакетным тикерам (fetch_tickers), до запросов стакана.
+    Отбрасывает символы, которые заведомо не прошли бы проверку стакана: без котировок
+    (нет ни bid, ни ask) и с односторонней котировкой (объём другой стороны 0), а также
+    с оборотом за 24ч ниже min_quote_volume (ExchangeProfile.min_quote_volume_24h).
+    Если по символу данных нет — он остаётся и проходит полную проверку стакана.
+    """
+    if not exchange.has.get('fetchTickers'):
+        print(f"{exchange.id}: пакетный запрос тикеров не поддерживается, предфильтр пропущен")
+        return list(symbols)
+
+    try:
+        tickers = await guard.call('tickers', exchange.fetch_tickers, symbols)
+    except Exception as e:
+        print(f"{exchange.id}: ошибка пакетного запроса тикеров, предфильтр пропущен: {e}")
+        return list(symbols)
+
+    # Пустые bid/ask означают пустой стакан, только если биржа вообще отдаёт котировки в тикерах
+    has_quotes = any(
+        ticker.get('bid') is not None or ticker.get('ask') is not None
+        for ticker in tickers.values()
+    )
+
+    liquid_symbols = []
+    for symbol in symbols:
+        ticker = tickers.get(symbol)
+        if ticker is None:
+            liquid_symbols.append(symbol)
+            continue
+
+        bid, ask = ticker.get('bid'), ticker.get('ask')
+        if has_quotes and (bid is None or ask is None):
+            continue  # Одна или обе стороны стакана пусты — объём по ним заведомо 0
+
+        quote_volume = ticker.get('quoteVolume')
+        if min_quote_volume is not None and quote_volume is not None and quote_volume < min_quote_volume:
+            continue
+
+        liquid_symbols.append(symbol)
+
+    print(f"{exchange.id}: предфильтр ликвидности пропустил {len(liquid_symbols)}/{len(symbols)} символов")
+    return liquid_symbols
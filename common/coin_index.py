@@ -0,0 +1,84 @@
+# coin_index.py — индекс монет по снимку результатов: точный поиск по базовому активу, префиксный и нечёткий
+
+from bisect import bisect_left
+from collections import defaultdict
+
+from common.symbol_registry import split_multiplier
+
+# Режимы поиска: exact — базовый актив целиком (BTC не находит BTCDOM),
+# prefix — актив начинается с запроса, fuzzy — запрос встречается в активе (через триграммы)
+MATCH_MODES = ('exact', 'prefix', 'fuzzy')
+
+
+def base_asset(pair: str):
+    """Базовый актив пары ccxt: 'BTC/USDT:USDT' -> 'BTC'."""
+    return pair.split('/', 1)[0].upper()
+
+
+def trigrams(text: str):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CoinIndex:
+    """
+    Строится один раз на снимок данных {биржа: {пара: запись}}.
+    by_base: актив -> [(биржа, пара)]; sorted_bases — для префиксного поиска через bisect;
+    trigram_index: триграмма -> активы, для поиска подстроки без перебора всех пар.
+    С реестром символов (common/symbol_registry.py) актив канонический: 1000PEPE, kPEPE и PEPE — один актив.
+    """
+
+    def __init__(self, data: dict, registry=None):
+        self.registry = registry
+        self.by_base = defaultdict(list)
+        for exchange, pairs in data.items():
+            for pair in pairs:
+                asset = registry.asset(exchange, pair) if registry is not None else base_asset(pair)
+                self.by_base[asset].append((exchange, pair))
+        self.by_base = dict(self.by_base)
+        self.sorted_bases = sorted(self.by_base)
+
+        self.trigram_index = defaultdict(set)
+        for base in self.by_base:
+            for trigram in trigrams(base):
+                self.trigram_index[trigram].add(base)
+
+    def _prefix_bases(self, prefix: str):
+        start = bisect_left(self.sorted_bases, prefix)
+        bases = []
+        for base in self.sorted_bases[start:]:
+            if not base.startswith(prefix):
+                break
+            bases.append(base)
+        return bases
+
+    def _fuzzy_bases(self, query: str):
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            # Запрос короче трёх символов: триграмм нет, ищем по префиксу
+            return self._prefix_bases(query)
+        candidates = set.intersection(*(self.trigram_index.get(trigram, set()) for trigram in query_trigrams))
+        # Общие триграммы ещё не гарантируют подстроку — проверяем кандидатов
+        return sorted(base for base in candidates if query in base)
+
+    def bases(self, query: str, match: str = 'exact'):
+        """Активы, подходящие под запрос в режиме match."""
+        query = query.strip().upper()
+        if not query:
+            return []
+        if self.registry is not None:
+            query = split_multiplier(query)[0]  # Запрос 1000PEPE ищет канонический PEPE
+        if match == 'exact':
+            return [query] if query in self.by_base else []
+        if match == 'prefix':
+            return self._prefix_bases(query)
+        if match == 'fuzzy':
+            return self._fuzzy_bases(query)
+        raise ValueError(f"Неизвестный режим поиска: {match} (доступны: {', '.join(MATCH_MODES)})")
+
+    def search(self, query: str, match: str = 'exact'):
+        """Пары по биржам: {биржа: [пара, ...]}."""
+        results = defaultdict(list)
+        for base in self.bases(query, match):
+            for exchange, pair in self.by_base[base]:
+                results[exchange].append(pair)
+        return dict(results)
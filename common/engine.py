@@ -0,0 +1,308 @@
+# engine.py — общий движок сбора funding-данных; биржи задаются профилями (common/profiles.py)
+
+import json
+from datetime import datetime, timedelta
+from functools import partial
+
+import ccxt.async_support as ccxt
+from tqdm import tqdm
+
+from common.bulk import fetch_funding_snapshot, filter_liquid_symbols
+from common.history import fetch_full_funding_history, funding_interval_from_rate
+from common.history_cache import HistoryCache
+from common.http_session import SESSION_POOL
+from common.latency import LatencyTracker
+from common.markets_cache import MarketsCache
+from common.metrics import add_metrics
+from common.pipeline import Pipeline, Stage
+from common.publish import publish_snapshot
+from common.rate_limiter import TokenBucket
+from common.results_sink import JsonlSink
+from common.resilience import CircuitBreaker, CircuitOpenError, RequestGuard
+from common.window_agg import FundingSeries
+
+
+def book_volumes(order_book, levels: int):
+    """Объём (цена × количество) первых levels уровней стакана: (askTotalVolume, bidTotalVolume)."""
+    # Берём только первые 2 значения: [price, volume, ...]
+    ask_total = sum(level[0] * level[1] for level in order_book['asks'][:levels])
+    bid_total = sum(level[0] * level[1] for level in order_book['bids'][:levels])
+    return ask_total, bid_total
+
+
+def parse_funding_rate(fr_data, next_funding_keys: tuple):
+    """Текущий FR (в %) и время следующей выплаты строкой из структуры funding rate ccxt."""
+    current_funding = fr_data.get('fundingRate')
+    next_funding_time_str = None
+    next_ts = next((fr_data.get(key) for key in next_funding_keys if fr_data.get(key)), None)
+    if next_ts:
+        next_funding_time_str = datetime.utcfromtimestamp(next_ts / 1000).strftime('%Y-%m-%d %H:%M UTC')
+    if current_funding is not None:
+        current_funding *= 100  # в %
+    return current_funding, next_funding_time_str
+
+
+class FundingEngine:
+    """
+    Сбор funding-данных одной биржи: предфильтр ликвидности, стакан, текущий FR,
+    история за окна profile.windows. Всё, чем биржи различаются, берётся из профиля.
+    """
+
+    def __init__(self, profile, ccxt_module=ccxt):
+        self.profile = profile
+        # ccxt_module — ccxt.async_support для REST или ccxt.pro для потокового режима (common/streaming.py)
+        self.exchange = getattr(ccxt_module, profile.ccxt_class)(profile.client_options)
+
+        # Общий token bucket на все запросы к бирже
+        self.rate_limiter = TokenBucket.from_config(profile.rate_limit, self.exchange.rateLimit)
+        print(f"{profile.name}: установлен рейт-лимит {self.rate_limiter}")
+
+        # Все запросы идут через guard: рейт-лимит, повторы временных ошибок и circuit breaker биржи,
+        # таймауты по наблюдаемым задержкам (клиентский timeout из профиля — верхняя граница)
+        self.breaker = CircuitBreaker(profile.name)
+        self.latency = LatencyTracker(ceiling_seconds=self.exchange.timeout / 1000)
+        self.guard = RequestGuard(self.rate_limiter, self.breaker, latency=self.latency,
+                                  hedged_endpoints=profile.hedged_endpoints)
+
+        # Кэш истории FR между запусками и кэш рынков с TTL
+        self.history_cache = HistoryCache(f"{profile.data_dir}/funding_history_cache_{profile.file_suffix}.json")
+        self.markets_cache = MarketsCache(f"{profile.data_dir}/markets_cache_{profile.file_suffix}.json")
+
+    async def open_session(self):
+        """Подключает клиент ccxt к общей сессии биржи (keep-alive, кэш DNS) и прогревает соединения."""
+        # Сессия общая и живёт дольше клиента: ccxt не должен закрывать её в exchange.close()
+        self.exchange.own_session = False
+        self.exchange.session = SESSION_POOL.session_for(self.profile)
+        await SESSION_POOL.warm_up(self.profile, self.rate_limiter)
+
+    def load_symbols(self):
+        """Читает список символов от *_getSymbols.py и оставляет только известные бирже контракты."""
+        input_file = f"{self.profile.data_dir}/{self.profile.pairs_file}"
+        with open(input_file, "r", encoding="utf-8") as f:
+            raw_symbols = json.load(f)
+
+        markets = self.exchange.markets or {}
+        valid_symbols = []
+        for symbol in raw_symbols:
+            market = markets.get(symbol)
+            if not markets or (market is not None and market.get('contract', False)):
+                # Без загруженных рынков символ проверит сама биржа при запросе
+                valid_symbols.append(symbol)
+                continue
+
+            # Пробуем формат BASE/<settle>:<settle> (например, BTC/USDT -> BTC/USDC:USDC на Hyperliquid)
+            settle = self.profile.settle_fallback
+            parts = symbol.split('/')
+            converted_symbol = f"{parts[0]}/{settle}:{settle}" if settle and len(parts) == 2 else None
+            if converted_symbol and markets.get(converted_symbol, {}).get('contract', False):
+                valid_symbols.append(converted_symbol)
+                print(f"Символ {symbol} преобразован в {converted_symbol}")
+            else:
+                print(f"Пропущен {symbol}: не найден в рынках {self.profile.name} как perpetual")
+
+        return valid_symbols
+
+    async def fetch_book_volumes(self, symbol: str):
+        """Объём (цена × количество) первых уровней стакана: (askTotalVolume, bidTotalVolume) или None при ошибке."""
+        try:
+            order_book = await self.guard.call('order_book', self.exchange.fetch_order_book, symbol, limit=self.profile.order_book_limit)
+        except CircuitOpenError:
+            return None
+        except Exception as e:
+            print(f"Ошибка получения стакана для {symbol}: {e}")
+            return None
+        return book_volumes(order_book, self.profile.order_book_levels)
+
+    async def fetch_current_funding(self, symbol: str, funding_snapshot: dict):
+        """
+        Текущий funding rate (в %) и время следующей выплаты: из пакетного снимка,
+        иначе отдельным запросом. Возвращает (current_funding, next_funding_time_str, fr_data).
+        """
+        current_funding = None
+        next_funding_time_str = None
+        fr_data = funding_snapshot.get(symbol)
+        try:
+            if fr_data is None:
+                fr_data = await self.guard.call('funding_rate', self.exchange.fetch_funding_rate, symbol)
+            current_funding, next_funding_time_str = parse_funding_rate(fr_data, self.profile.next_funding_keys)
+        except Exception as e:
+            print(f"Ошибка текущего FR для {symbol}: {e}")
+        return current_funding, next_funding_time_str, fr_data
+
+    async def fetch_history(self, symbol: str, start_time_ms: int, end_time_ms: int, fr_data):
+        """История FR за [start_time_ms, end_time_ms]: новые записи с биржи плюс кэш прошлых запусков."""
+        since = self.history_cache.since(symbol, start_time_ms)  # Только записи новее уже сохранённых в кэше
+        new_history = await fetch_full_funding_history(
+            self.exchange,
+            self.guard,
+            symbol,
+            start_time_ms=since,
+            end_time_ms=end_time_ms,
+            limit=self.profile.history_page_size,
+            interval_hours=funding_interval_from_rate(fr_data),  # Для параллельной загрузки отрезками
+        )
+        # Объединяем с кэшем (дубликаты по timestamp отбрасываются)
+        full_funding_history = self.history_cache.merge(symbol, new_history, since)
+        # В кэше может лежать история длиннее окна (её глубина — profile.history_retention_hours)
+        full_funding_history = [entry for entry in full_funding_history if entry['timestamp'] > start_time_ms]
+        print(f"[DEBUG] {symbol}: получено {len(new_history)} новых, всего {len(full_funding_history)} записей истории FR")
+        return full_funding_history
+
+    def summarize(self, symbol: str, history: list, timestamps: dict, end_time_ms: int, current_funding):
+        """
+        Суммы FR (в %) по окнам и интервал выплат. Интервал по истории определяется позже,
+        для всех символов сразу (add_metrics), поэтому здесь он None. Без истории — оценка
+        по текущему FR с интервалом из профиля, если он там задан.
+        """
+        history_in_range = [entry for entry in history if entry['timestamp'] < end_time_ms]
+
+        if history_in_range:
+            # Каждое окно — два бинарных поиска по префиксным суммам, а не проход по всей истории
+            return FundingSeries(history_in_range).window_totals(timestamps, end_time_ms), None
+
+        totals = {window: 0.0 for window in timestamps}
+        assumed_interval_hours = self.profile.assumed_interval_hours
+        if assumed_interval_hours is None:
+            return totals, None
+
+        # Истории нет: считаем приближённо FR * количество_фандингов (округлённое)
+        print(f"[DEBUG] {symbol}: нет истории FR за окно, используем текущий FR как приближение")
+        if current_funding is not None:
+            for window in totals:
+                totals[window] = current_funding * round(int(window[:-1]) / assumed_interval_hours)
+        return totals, assumed_interval_hours
+
+    async def check_liquidity(self, symbol: str):
+        """Стадия book: объём стакана; неликвидный символ отсеивается (None)."""
+        volumes = await self.fetch_book_volumes(symbol)
+        if volumes is None:
+            return None  # прерываем обработку этого символа
+        askTotalVolume, bidTotalVolume = volumes
+
+        min_volume = self.profile.min_side_volume
+        if askTotalVolume <= min_volume or bidTotalVolume <= min_volume:
+            return None
+        return {'symbol': symbol, 'askTotalVolume': askTotalVolume, 'bidTotalVolume': bidTotalVolume}
+
+    async def attach_funding(self, item: dict, funding_snapshot: dict):
+        """Стадия funding: текущий FR и время следующей выплаты."""
+        current_funding, next_funding_time_str, fr_data = await self.fetch_current_funding(item['symbol'], funding_snapshot)
+        item.update(current_funding=current_funding, next_funding_time_str=next_funding_time_str, fr_data=fr_data)
+        return item
+
+    async def attach_history(self, item: dict, timestamps: dict, now: datetime):
+        """Стадия history: история за самое длинное окно и итоговая запись символа — (symbol, record)."""
+        symbol = item['symbol']
+        current_funding = item['current_funding']
+
+        start_time_ms = min(timestamps.values())
+        end_time_ms = int(now.timestamp() * 1000)
+        full_funding_history = await self.fetch_history(symbol, start_time_ms, end_time_ms, item['fr_data'])
+
+        totals, funding_interval_hours = self.summarize(symbol, full_funding_history, timestamps, end_time_ms, current_funding)
+
+        return symbol, {
+            **{window: round(total, 6) for window, total in totals.items()},
+            "currentFR": round(current_funding, 6) if current_funding is not None else None,
+            "fundingIntervalHours": funding_interval_hours,
+            "nextFundingTime": item['next_funding_time_str'],
+            "askTotalVolume": round(item['askTotalVolume'], 2),
+            "bidTotalVolume": round(item['bidTotalVolume'], 2)
+        }
+
+    @property
+    def partial_results_path(self):
+        return f"{self.profile.data_dir}/funding_results_{self.profile.file_suffix}.jsonl"
+
+    async def iter_records(self, now: datetime = None):
+        """
+        Асинхронный генератор: отдаёт (symbol, запись) по мере готовности каждого символа.
+        now — общее опорное время, когда несколько бирж опрашиваются в одном процессе.
+        Кэш истории сохраняется и клиент закрывается, даже если потребитель прервал перебор.
+        """
+        profile = self.profile
+        self.history_cache.load()  # Только чтение файла: до try, чтобы finally не сохранил пустой кэш поверх
+
+        if now is None:
+            now = datetime.now()
+        timestamps = {
+            f"{hours}h": int((now - timedelta(hours=hours)).timestamp() * 1000)
+            for hours in profile.windows
+        }
+
+        try:
+            # Прогрев и загрузка рынков — уже сетевые запросы: при их ошибке клиент тоже закрывается в finally
+            await self.open_session()
+            await self.markets_cache.load(self.exchange)
+
+            symbols = self.load_symbols()
+            if not symbols:
+                print(f"Нет символов для обработки на {profile.name}!")
+                return
+
+            if profile.bulk_tickers:
+                # Отсекаем явно неликвидные контракты по пакетным тикерам, стакан запрашиваем только для оставшихся
+                symbols = await filter_liquid_symbols(self.exchange, symbols, self.guard, profile.min_quote_volume_24h)
+
+            funding_snapshot = {}
+            if profile.bulk_funding:
+                # Текущий FR для всех символов одним запросом (где биржа это поддерживает)
+                funding_snapshot = await fetch_funding_snapshot(self.exchange, symbols, self.guard)
+
+            # Стадии со своими пулами воркеров: долгая пагинация истории не занимает слоты проверки стакана
+            progress = tqdm(total=len(symbols), desc=f"Обработка символов {profile.name}") if profile.progress_bar else None
+            pipeline = Pipeline(
+                [
+                    Stage('book', self.check_liquidity, profile.workers('book')),
+                    Stage('funding', partial(self.attach_funding, funding_snapshot=funding_snapshot), profile.workers('funding')),
+                    Stage('history', partial(self.attach_history, timestamps=timestamps, now=now), profile.workers('history')),
+                ],
+                on_item_done=progress.update if progress is not None else None,
+            )
+            try:
+                async for symbol, record in pipeline.stream(symbols):
+                    yield symbol, record
+            finally:
+                if progress is not None:
+                    progress.close()
+
+            if self.breaker.times_opened:
+                print(f"{profile.name}: circuit breaker — {self.breaker}")
+            for line in self.latency.summary():
+                print(f"{profile.name}: {line}")
+            print(f"{profile.name}: HTTP — {SESSION_POOL.stats[profile.folder]}")
+        finally:
+            # Не короче самого длинного возможного окна, а не окон этого запуска (см. HISTORY_RETENTION_HOURS)
+            retention_start = now - timedelta(hours=profile.history_retention_hours)
+            self.history_cache.evict(int(retention_start.timestamp() * 1000))
+            self.history_cache.save()
+            await self.exchange.close()
+
+    async def fetch_all(self, now: datetime = None):
+        """
+        Собирает данные по всем символам биржи и возвращает словарь результатов.
+        Каждый готовый символ сразу дописывается в funding_results_<suffix>.jsonl,
+        итоговый funding_results_<suffix>.json пишет save_results.
+        Метрики истории (APR, std, доля положительных выплат, просадка) и интервал выплат
+        считаются в конце одним векторным проходом по всем символам (common/metrics.py);
+        в .jsonl по мере готовности символы попадают ещё без них.
+        """
+        if now is None:
+            now = datetime.now()
+        results = {}
+        with JsonlSink(self.partial_results_path) as sink:
+            async for symbol, record in self.iter_records(now):
+                results[symbol] = record
+                sink.append(symbol, record)
+        # В кэше истории к этому моменту лежит история каждого символа не короче самого длинного окна
+        start_time_ms = int((now - timedelta(hours=max(self.profile.windows))).timestamp() * 1000)
+        return add_metrics(results, self.history_cache.data, int(now.timestamp() * 1000), start_time_ms)
+
+    def save_results(self, results: dict):
+        """Публикует funding_results_<suffix>.json атомарно, с версионированным снимком (common/publish.py)."""
+        name = f"funding_results_{self.profile.file_suffix}"
+        try:
+            pointer = publish_snapshot(results, self.profile.data_dir, name)
+            print(f"Результаты {self.profile.name} сохранены в: {self.profile.data_dir}/{name}.json (версия {pointer['version']})")
+        except Exception as e:
+            print(f"Ошибка сохранения: {e}")
@@ -0,0 +1,107 @@
+# history.py — загрузка истории funding rate: последовательная и параллельная по отрезкам времени
+
+import asyncio
+
+# Сколько отрезков одного символа запрашиваются одновременно (общий рейт-лимит guard при этом соблюдается)
+MAX_SLICE_CONCURRENCY = 4
+
+# Доля страницы, которую должен занимать один отрезок: запас на пропуски и неточный интервал
+SLICE_PAGE_FILL = 0.9
+
+
+def funding_interval_from_rate(fr_data):
+    """Интервал выплат в часах из структуры funding rate ccxt (поле 'interval', например '8h')."""
+    if not fr_data:
+        return None
+    interval = fr_data.get('interval')
+    if isinstance(interval, str) and interval.endswith('h') and interval[:-1].isdigit():
+        hours = int(interval[:-1])
+        return hours if hours > 0 else None
+    return None
+
+
+async def fetch_history_range(exchange, guard, symbol: str, start_time_ms: int, end_time_ms: int, limit: int, max_iterations: int = 20):
+    """
+    Последовательно листает историю от start_time_ms, пока не дойдёт до end_time_ms.
+    Возвращает (записи, complete). complete=False — сбор прерван ошибкой,
+    записи при этом идут без пропусков от start_time_ms.
+    """
+    all_history = []
+    current_since = start_time_ms
+    iteration_count = 0
+
+    while iteration_count < max_iterations:
+        try:
+            # Запрашиваем историю с текущего 'since' (рейт-лимит и повторы временных ошибок — в guard)
+            partial_history = await guard.call(
+                'funding_history',
+                exchange.fetch_funding_rate_history,
+                symbol=symbol,
+                since=current_since,
+                limit=limit
+            )
+        except Exception as e:
+            print(f"Ошибка при частичном запросе истории FR для {symbol} (since {current_since}): {e}")
+            return all_history, False  # Останавливаем сбор, если ошибка
+
+        if not partial_history:
+            # Нет новых данных, выходим
+            break
+
+        all_history.extend(partial_history)
+
+        # Находим самый поздний timestamp в полученных данных
+        latest_ts = max(entry['timestamp'] for entry in partial_history)
+
+        if latest_ts >= end_time_ms:
+            # Достигли конца нужного диапазона
+            break
+
+        # Следующий 'since' — на 1 мс позже последней записи, чтобы не дублировать
+        current_since = latest_ts + 1
+        iteration_count += 1
+
+    return all_history, True
+
+
+async def fetch_full_funding_history(exchange, guard, symbol: str, start_time_ms: int, end_time_ms: int, limit: int, interval_hours: int = None):
+    """
+    Собирает всю историю funding rate для символа в заданном диапазоне.
+
+    Если интервал выплат известен, диапазон делится на отрезки примерно по одной странице
+    (limit записей) и отрезки запрашиваются параллельно, после чего склеиваются
+    с удалением дубликатов по timestamp. Иначе — последовательная постраничная загрузка.
+    """
+    slice_ms = int(limit * SLICE_PAGE_FILL) * (interval_hours or 0) * 3600 * 1000
+    if not slice_ms or end_time_ms - start_time_ms <= slice_ms:
+        history, _ = await fetch_history_range(exchange, guard, symbol, start_time_ms, end_time_ms, limit)
+        return history
+
+    bounds = []
+    slice_start = start_time_ms
+    while slice_start < end_time_ms:
+        slice_end = min(slice_start + slice_ms, end_time_ms)
+        bounds.append((slice_start, slice_end))
+        slice_start = slice_end
+
+    slice_semaphore = asyncio.Semaphore(MAX_SLICE_CONCURRENCY)
+
+    async def fetch_slice(slice_start, slice_end):
+        async with slice_semaphore:
+            return await fetch_history_range(exchange, guard, symbol, slice_start, slice_end, limit)
+
+    slices = await asyncio.gather(*(fetch_slice(slice_start, slice_end) for slice_start, slice_end in bounds))
+
+    merged = {}
+    for (slice_start, slice_end), (history, complete) in zip(bounds, slices):
+        last_slice = slice_end == end_time_ms
+        for entry in history:
+            ts = entry['timestamp']
+            # Записи за концом отрезка принадлежат следующему (кроме последнего отрезка)
+            if ts >= slice_start and (last_slice or ts < slice_end):
+                merged[ts] = entry
+        if not complete:
+            # Дальше будет дыра в истории: отдаём только непрерывную часть, остальное догрузится в следующем цикле
+            break
+
+    return [merged[ts] for ts in sorted(merged)]
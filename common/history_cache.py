@@ -0,0 +1,99 @@
+# history_cache.py — кэш истории funding rate между запусками
+
+import json
+from pathlib import Path
+
+from common.publish import atomic_write_json
+
+
+class HistoryCache:
+    """
+    Кэш истории funding rate на диске для одной биржи:
+    {symbol: [[timestamp, fundingRate], ...]} по возрастанию времени.
+    coverage — с какого момента история символа в кэше полная (все записи новее этого timestamp).
+    В следующем цикле у биржи запрашиваются только записи новее последней сохранённой,
+    а если нужно окно длиннее покрытия кэша — история перезапрашивается с начала окна.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.data = {}
+        self.coverage = {}
+
+    def load(self):
+        """Загружает кэш с диска. Повреждённый или отсутствующий файл — пустой кэш."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if 'history' in cached and 'coverage' in cached:
+                self.data, self.coverage = cached['history'], cached['coverage']
+            else:
+                # Старый формат без покрытия: история каждого символа перезапросится за всё окно
+                self.data, self.coverage = cached, {}
+            print(f"Кэш истории FR загружен: {self.path} ({len(self.data)} символов)")
+        except FileNotFoundError:
+            self.data, self.coverage = {}, {}
+        except json.JSONDecodeError:
+            print(f"Кэш истории FR повреждён, начинаем с пустого: {self.path}")
+            self.data, self.coverage = {}, {}
+
+    def save(self):
+        try:
+            # Атомарно: недописанный файл при следующем запуске пришлось бы выбросить целиком
+            atomic_write_json(self.path, {'coverage': self.coverage, 'history': self.data}, indent=None)
+            print(f"Кэш истории FR сохранён: {self.path}")
+        except Exception as e:
+            print(f"Ошибка сохранения кэша истории FR: {e}")
+
+    def last_timestamp(self, symbol: str):
+        records = self.data.get(symbol)
+        return records[-1][0] if records else None
+
+    def since(self, symbol: str, start_time_ms: int):
+        """
+        С какого момента запрашивать историю: сразу после последней записи в кэше, но не раньше start_time_ms.
+        Если кэш покрывает не всё окно (прошлый запуск считал окна короче), — с start_time_ms.
+        """
+        covered = self.coverage.get(symbol)
+        last_ts = self.last_timestamp(symbol)
+        if covered is None or start_time_ms < covered or last_ts is None:
+            return start_time_ms
+        return max(start_time_ms, last_ts + 1)
+
+    def merge(self, symbol: str, new_history: list, fetched_from: int):
+        """
+        Добавляет новые записи к кэшу символа (дубликаты по timestamp отбрасываются)
+        и возвращает полную историю в формате ccxt. fetched_from — с какого момента запрашивались
+        новые записи (результат since); старые записи удаляет evict в конце цикла.
+        """
+        cached = self.data.get(symbol, [])
+        merged = {ts: rate for ts, rate in cached}
+        new_timestamps = []
+        for entry in new_history:
+            if entry.get('fundingRate') is None:
+                continue
+            merged[entry['timestamp']] = entry['fundingRate']
+            new_timestamps.append(entry['timestamp'])
+
+        covered = self.coverage.get(symbol)
+        if covered is None or fetched_from < covered:
+            # Перезапрос с начала окна: покрытие расширяется, только если новые записи сомкнулись с кэшем
+            # (при ошибке загрузки история идёт без пропусков от fetched_from, но может оборваться раньше)
+            if not cached or (new_timestamps and max(new_timestamps) >= cached[0][0]):
+                self.coverage[symbol] = fetched_from
+
+        records = sorted([ts, rate] for ts, rate in merged.items())
+        self.data[symbol] = records
+        return [{'timestamp': ts, 'fundingRate': rate} for ts, rate in records]
+
+    def evict(self, oldest_ts: int):
+        """Удаляет записи не новее oldest_ts у всех символов, включая те, что в этом цикле не обрабатывались."""
+        for symbol in list(self.data):
+            records = [record for record in self.data[symbol] if record[0] > oldest_ts]
+            if records:
+                self.data[symbol] = records
+                if symbol in self.coverage:
+                    self.coverage[symbol] = max(self.coverage[symbol], oldest_ts)
+            else:
+                del self.data[symbol]
+                self.coverage.pop(symbol, None)
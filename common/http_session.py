@@ -0,0 +1,128 @@
+# http_session.py — общие HTTP-сессии aiohttp для клиентов ccxt: keep-alive, кэш DNS, прогрев соединений
+
+import asyncio
+import ssl
+
+import aiohttp
+import certifi
+
+from common.history import MAX_SLICE_CONCURRENCY
+
+# Сколько секунд держать простаивающее соединение открытым (между циклами опроса в одном процессе)
+KEEPALIVE_SECONDS = 120
+# Сколько секунд помнить ответ DNS
+DNS_CACHE_TTL_SECONDS = 600
+
+
+class ConnectionStats:
+    """Счётчики одной сессии через aiohttp TraceConfig: сколько запросов обслужено по уже открытым соединениям."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+    def trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.requests += 1
+
+        async def on_connection_create_end(session, context, params):
+            self.connections_created += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, context, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, context, params):
+            self.dns_cache_misses += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    def __str__(self):
+        connections = self.connections_created + self.connections_reused
+        reuse = self.connections_reused / connections * 100 if connections else 0
+        return (f"запросов {self.requests}, новых соединений {self.connections_created}, "
+                f"переиспользовано {self.connections_reused} ({reuse:.0f}%), "
+                f"DNS из кэша {self.dns_cache_hits}/{self.dns_cache_hits + self.dns_cache_misses}")
+
+
+class SessionPool:
+    """
+    HTTP-сессии процесса: по одной на биржу, общие для всех её клиентов ccxt и всех циклов опроса.
+    Лимит соединений на хост совпадает с параллелизмом профиля (воркеры стадий, история — × отрезки).
+    Сертификаты — из certifi, поэтому проверку SSL отключать не нужно.
+    """
+
+    def __init__(self):
+        self.sessions = {}  # {папка биржи: (сессия, event loop, в котором она создана)}
+        self.stats = {}
+        self.warmed_up = set()
+
+    def session_for(self, profile):
+        """Сессия биржи; создаётся при первом обращении (внутри работающего event loop)."""
+        loop = asyncio.get_running_loop()
+        session, session_loop = self.sessions.get(profile.folder, (None, None))
+        if session is not None and not session.closed and session_loop is loop:
+            return session
+
+        verify = profile.client_options.get('verify', True)
+        if not verify:
+            print(f"{profile.name}: ВНИМАНИЕ — проверка SSL отключена в профиле")
+        connector = aiohttp.TCPConnector(
+            ssl=ssl.create_default_context(cafile=certifi.where()) if verify else False,
+            limit_per_host=profile.workers('book') + profile.workers('funding')
+            + profile.workers('history') * MAX_SLICE_CONCURRENCY,
+            keepalive_timeout=KEEPALIVE_SECONDS,
+            use_dns_cache=True,
+            ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+            enable_cleanup_closed=True,
+        )
+        stats = ConnectionStats()
+        session = aiohttp.ClientSession(connector=connector, trace_configs=[stats.trace_config()])
+        self.sessions[profile.folder] = (session, loop)
+        self.stats[profile.folder] = stats
+        self.warmed_up.discard(profile.folder)  # Новая сессия — соединения нужно прогреть заново
+        return session
+
+    async def warm_up(self, profile, rate_limiter):
+        """
+        Открывает profile.concurrency соединений к бирже до начала основной работы:
+        DNS, TCP и TLS оплачиваются здесь, а не первыми запросами стакана.
+        Повторно для той же сессии не выполняется.
+        """
+        if profile.warmup_url is None or profile.folder in self.warmed_up:
+            return
+        session = self.session_for(profile)
+
+        async def open_connection():
+            await rate_limiter.acquire()
+            try:
+                async with session.get(profile.warmup_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    await response.read()  # Дочитываем ответ, чтобы соединение вернулось в пул
+            except Exception as e:
+                print(f"{profile.name}: прогрев соединения не удался: {e}")
+
+        await asyncio.gather(*(open_connection() for _ in range(profile.concurrency)))
+        self.warmed_up.add(profile.folder)
+        print(f"{profile.name}: прогрето соединений {self.stats[profile.folder].connections_created}")
+
+    async def close(self):
+        for session, _ in self.sessions.values():
+            await session.close()
+        self.sessions.clear()
+        self.warmed_up.clear()
+
+
+# Один пул на процесс: все биржи, запущенные в одном event loop, берут сессии отсюда
+SESSION_POOL = SessionPool()
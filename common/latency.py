@@ -0,0 +1,83 @@
+# latency.py — скользящие гистограммы задержек по эндпоинтам и адаптивные таймауты на их основе
+
+from collections import defaultdict, deque
+
+# Сколько последних замеров хранить на эндпоинт
+LATENCY_WINDOW = 500
+# Пока замеров меньше — таймаут остаётся клиентским (из профиля), дублирующие запросы не отправляются
+MIN_SAMPLES = 20
+# Таймаут = p99 × TIMEOUT_P99_MULTIPLIER, но не меньше MIN_TIMEOUT_SECONDS и не больше клиентского
+TIMEOUT_P99_MULTIPLIER = 3
+MIN_TIMEOUT_SECONDS = 0.5
+# Дублирующий запрос отправляется, если ответа нет дольше p95
+HEDGE_PERCENTILE = 95
+
+
+class LatencyHistogram:
+    """Последние LATENCY_WINDOW задержек одного эндпоинта (в секундах)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def percentile(self, p: float):
+        """Перцентиль p (0–100) по ближайшему рангу или None, если замеров нет."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+
+class LatencyTracker:
+    """
+    Задержки одной биржи по эндпоинтам (order_book, funding_history, ...).
+    Отсюда берутся таймаут запроса (p99 × k) и порог дублирующего запроса (p95).
+    ceiling_seconds — клиентский таймаут ccxt, выше которого адаптивный не поднимается.
+    """
+
+    def __init__(self, ceiling_seconds: float):
+        self.ceiling_seconds = ceiling_seconds
+        self.histograms = defaultdict(LatencyHistogram)
+        self.hedges_sent = defaultdict(int)
+        self.hedges_won = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float):
+        self.histograms[endpoint].record(seconds)
+
+    def timeout_for(self, endpoint: str):
+        """Таймаут запроса к endpoint в секундах или None (пока мало замеров — действует клиентский)."""
+        histogram = self.histograms[endpoint]
+        if len(histogram) < MIN_SAMPLES:
+            return None
+        timeout = histogram.percentile(99) * TIMEOUT_P99_MULTIPLIER
+        return min(self.ceiling_seconds, max(MIN_TIMEOUT_SECONDS, timeout))
+
+    def hedge_delay(self, endpoint: str):
+        """Через сколько секунд без ответа отправлять дублирующий запрос, или None."""
+        histogram = self.histograms[endpoint]
+        if len(histogram) < MIN_SAMPLES:
+            return None
+        return histogram.percentile(HEDGE_PERCENTILE)
+
+    def summary(self):
+        """Строки для вывода: перцентили, текущий таймаут и дублирующие запросы по каждому эндпоинту."""
+        lines = []
+        for endpoint, histogram in sorted(self.histograms.items()):
+            if not histogram:
+                continue
+            timeout = self.timeout_for(endpoint)
+            line = (f"{endpoint}: {len(histogram)} замеров, "
+                    f"p50 {histogram.percentile(50):.3f} с, p95 {histogram.percentile(95):.3f} с, "
+                    f"p99 {histogram.percentile(99):.3f} с, таймаут "
+                    f"{f'{timeout:.2f} с' if timeout is not None else 'клиентский'}")
+            if self.hedges_sent[endpoint]:
+                line += f", дублей {self.hedges_sent[endpoint]} (быстрее основного {self.hedges_won[endpoint]})"
+            lines.append(line)
+        return lines
+
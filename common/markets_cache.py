@@ -0,0 +1,82 @@
+# markets_cache.py — кэш рынков биржи (load_markets) на диске с TTL
+
+import json
+import os
+import time
+from pathlib import Path
+
+from common.publish import atomic_write_json
+
+# Сколько секунд кэш рынков считается свежим
+MARKETS_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+
+class MarketsCache:
+    """
+    Кэш метаданных рынков одной биржи (размеры контрактов, id символов, интервалы и т.д.).
+    Пока файл свежее ttl_seconds, рынки подставляются в клиент ccxt через set_markets
+    без сетевого запроса load_markets.
+    """
+
+    def __init__(self, path, ttl_seconds: float = MARKETS_CACHE_TTL_SECONDS):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+
+    def read(self):
+        """Возвращает {"markets": ..., "currencies": ...} из файла или None, если кэша нет или он устарел."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            print(f"Кэш рынков повреждён: {self.path}")
+            return None
+
+        age = time.time() - cached.get('saved_at', 0)
+        if age > self.ttl_seconds:
+            print(f"Кэш рынков устарел ({age / 3600:.1f} ч): {self.path}")
+            return None
+        return cached
+
+    def write(self, exchange):
+        try:
+            atomic_write_json(self.path, {
+                'saved_at': time.time(),
+                'markets': exchange.markets,
+                'currencies': exchange.currencies,
+            }, indent=None)
+            print(f"Кэш рынков {exchange.id} сохранён: {self.path}")
+        except Exception as e:
+            print(f"Ошибка сохранения кэша рынков {exchange.id}: {e}")
+
+    def invalidate(self):
+        """Явно сбрасывает кэш: следующий запуск загрузит рынки с биржи."""
+        try:
+            os.remove(self.path)
+            print(f"Кэш рынков сброшен: {self.path}")
+        except FileNotFoundError:
+            pass
+
+    def apply(self, exchange):
+        """Подставляет рынки из кэша в клиент ccxt. Возвращает True, если кэш был свежим."""
+        cached = self.read()
+        if cached is None:
+            return False
+        exchange.set_markets(cached['markets'], cached.get('currencies') or None)
+        print(f"Рынки {exchange.id} загружены из кэша: {len(exchange.markets)} шт.")
+        return True
+
+    async def load(self, exchange, reload: bool = False):
+        """load_markets для асинхронного клиента ccxt: из кэша, а при его отсутствии — с биржи с сохранением."""
+        if reload or not self.apply(exchange):
+            await exchange.load_markets(reload=True)
+            self.write(exchange)
+        return exchange.markets
+
+    def load_sync(self, exchange, reload: bool = False):
+        """То же, что load, для синхронного клиента ccxt (скрипты *_getSymbols.py)."""
+        if reload or not self.apply(exchange):
+            exchange.load_markets(reload=True)
+            self.write(exchange)
+        return exchange.markets
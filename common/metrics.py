@@ -0,0 +1,143 @@
+# metrics.py — метрики истории funding rate по всем символам сразу: APR, std, доля положительных выплат, просадка
+
+import numpy as np
+
+HOUR_MS = 3600 * 1000
+HOURS_PER_YEAR = 24 * 365
+
+# Поля, которые добавляются в запись символа рядом с окнами 24h…720h
+METRIC_FIELDS = ('aprFR', 'stdFR', 'positiveShare', 'maxDrawdownFR')
+
+
+def pack_histories(histories: list, end_time_ms: int, start_time_ms: int = None):
+    """
+    Складывает истории [[timestamp, fundingRate], ...] (по возрастанию времени) в общие массивы:
+    timestamps, rates (в %) и segments — номер символа для каждой записи.
+    Записи не раньше end_time_ms и не позже start_time_ms (если задан) отбрасываются.
+    Возвращает (timestamps, rates, segments, counts).
+    """
+    lengths = np.fromiter((len(history) for history in histories), dtype=np.int64, count=len(histories))
+    if not lengths.sum():
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, empty.astype(np.int64), np.zeros(len(histories), dtype=np.int64)
+
+    packed = np.concatenate([np.asarray(history, dtype=np.float64).reshape(-1, 2) for history in histories if history])
+    timestamps = packed[:, 0].astype(np.int64)
+    rates = packed[:, 1] * 100  # в %
+    segments = np.repeat(np.arange(len(histories)), lengths)
+
+    in_range = timestamps < end_time_ms
+    if start_time_ms is not None:
+        in_range &= timestamps > start_time_ms
+    timestamps, rates, segments = timestamps[in_range], rates[in_range], segments[in_range]
+    counts = np.bincount(segments, minlength=len(histories))
+    return timestamps, rates, segments, counts
+
+
+def detect_intervals(timestamps, segments, n: int):
+    """Самый частый шаг между выплатами в часах по каждому символу (0 — не определён)."""
+    intervals = np.zeros(n, dtype=np.int64)
+    same_symbol = segments[1:] == segments[:-1]
+    hours = np.rint(np.diff(timestamps) / HOUR_MS).astype(np.int64)
+    valid = same_symbol & (hours > 0)
+    if not valid.any():
+        return intervals
+
+    steps = hours[valid]
+    step_segments = segments[1:][valid]
+    # Мода по каждому символу: считаем пары (символ, шаг), затем берём самую частую пару символа
+    pairs, pair_counts = np.unique(np.stack([step_segments, steps]), axis=1, return_counts=True)
+    order = np.lexsort((pair_counts, pairs[0]))  # по символу, внутри — по частоте
+    last_of_symbol = np.r_[pairs[0][order][1:] != pairs[0][order][:-1], True]
+    best = order[last_of_symbol]
+    intervals[pairs[0][best]] = pairs[1][best]
+    return intervals
+
+
+def max_drawdowns(rates, segments, counts):
+    """Максимальная просадка накопленного FR (в %) по каждому символу, от пика (не ниже нуля) до минимума."""
+    drawdowns = np.zeros(len(counts))
+    if not len(rates):
+        return drawdowns
+
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    cumulative = np.cumsum(rates)
+    # Накопленная сумма внутри своего символа
+    before_segment = np.r_[0.0, cumulative][starts]
+    cumulative = cumulative - before_segment[segments]
+
+    # Бегущий максимум не должен переходить между символами: сдвигаем каждый символ выше всех предыдущих
+    shift = 2 * (np.abs(cumulative).max() + 1)
+    running_peak = np.maximum.accumulate(cumulative + segments * shift) - segments * shift
+    # Сдвиг туда и обратно даёт ошибку округления: просадка на самом пике выходит -1e-17 или -0.0
+    drawdown = np.maximum(np.maximum(running_peak, 0.0) - cumulative, 0.0) + 0.0
+
+    non_empty = counts > 0
+    drawdowns[non_empty] = np.maximum.reduceat(drawdown, starts[non_empty])
+    return drawdowns
+
+
+def compute_metrics(histories: list, end_time_ms: int, interval_hours: list = None, start_time_ms: int = None):
+    """
+    Метрики для списка историй за один векторный проход (по записям start_time_ms < timestamp < end_time_ms).
+    interval_hours — известный интервал выплат по символам (None — определить по истории).
+    Возвращает список словарей METRIC_FIELDS (значения None, если истории нет) с интервалом
+    выплат в часах в поле 'fundingIntervalHours' (None — не известен и не определился).
+    """
+    n = len(histories)
+    timestamps, rates, segments, counts = pack_histories(histories, end_time_ms, start_time_ms)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sums = np.bincount(segments, weights=rates, minlength=n)
+        means = sums / counts
+        variances = np.bincount(segments, weights=rates * rates, minlength=n) / counts - means ** 2
+        stds = np.sqrt(np.maximum(variances, 0.0))
+        positive_shares = np.bincount(segments, weights=(rates > 0).astype(np.float64), minlength=n) / counts
+
+    intervals = detect_intervals(timestamps, segments, n).astype(np.float64)
+    if interval_hours is not None:
+        known = np.array([hours or 0 for hours in interval_hours], dtype=np.float64)
+        intervals = np.where(known > 0, known, intervals)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        aprs = np.where(intervals > 0, means * HOURS_PER_YEAR / intervals, np.nan)
+
+    drawdowns = max_drawdowns(rates, segments, counts)
+
+    metrics = []
+    for i in range(n):
+        interval = int(intervals[i]) or None
+        if not counts[i]:
+            metrics.append({**dict.fromkeys(METRIC_FIELDS), 'fundingIntervalHours': interval})
+            continue
+        metrics.append({
+            'aprFR': round(float(aprs[i]), 6) if not np.isnan(aprs[i]) else None,
+            'stdFR': round(float(stds[i]), 6),
+            'positiveShare': round(float(positive_shares[i]), 4),
+            'maxDrawdownFR': round(float(drawdowns[i]), 6),
+            'fundingIntervalHours': interval,
+        })
+    return metrics
+
+
+def add_metrics(results: dict, histories: dict, end_time_ms: int, start_time_ms: int = None):
+    """
+    Дописывает метрики в записи results {symbol: запись} по историям {symbol: [[timestamp, fundingRate], ...]}
+    (формат кэша истории) за start_time_ms < timestamp < end_time_ms. Поля встают сразу после окон, до currentFR.
+    Пустой fundingIntervalHours записи заполняется интервалом, определённым по истории.
+    """
+    symbols = list(results)
+    metrics = compute_metrics(
+        [histories.get(symbol, []) for symbol in symbols],
+        end_time_ms,
+        [results[symbol].get('fundingIntervalHours') for symbol in symbols],
+        start_time_ms,
+    )
+    for symbol, symbol_metrics in zip(symbols, metrics):
+        record = results[symbol]
+        interval = symbol_metrics.pop('fundingIntervalHours')
+        if record.get('fundingIntervalHours') is None and 'fundingIntervalHours' in record:
+            record['fundingIntervalHours'] = interval
+        position = list(record).index('currentFR') if 'currentFR' in record else len(record)
+        items = list(record.items())
+        results[symbol] = dict(items[:position] + list(symbol_metrics.items()) + items[position:])
+    return results
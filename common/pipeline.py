@@ -0,0 +1,109 @@
+# pipeline.py — конвейер стадий с ограниченными очередями и своим пулом воркеров на каждую стадию
+
+import asyncio
+from dataclasses import dataclass
+
+# Сколько элементов может ждать в очереди стадии на одного её воркера
+QUEUE_SIZE_PER_WORKER = 2
+
+# Маркер конца потока элементов для воркеров стадии
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    Стадия конвейера: handler(item) -> элемент для следующей стадии или None (элемент отсеян).
+    workers — сколько элементов стадия обрабатывает одновременно.
+    """
+    name: str
+    handler: object
+    workers: int
+
+
+class Pipeline:
+    """
+    Элементы проходят стадии по очереди, стадии связаны ограниченными asyncio.Queue.
+    Медленная стадия (история) не занимает воркеров быстрой (стакан): каждая работает в своём темпе,
+    а переполненная очередь притормаживает предыдущую стадию.
+    Результат последней стадии передаётся в on_result (или отдаётся из stream) сразу,
+    как только элемент прошёл конвейер.
+    """
+
+    def __init__(self, stages: list, on_result=None, on_item_done=None):
+        self.stages = stages
+        self.on_result = on_result
+        self.on_item_done = on_item_done  # Вызывается для каждого элемента: прошёл или отсеян (прогресс)
+
+    def _finish_item(self):
+        if self.on_item_done is not None:
+            self.on_item_done()
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox):
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                print(f"Неожиданная ошибка на стадии {stage.name}: {e}")
+                result = None
+
+            if result is None:
+                self._finish_item()
+            elif outbox is not None:
+                await outbox.put(result)
+            else:
+                if self.on_result is not None:
+                    self.on_result(result)
+                self._finish_item()
+
+    async def stream(self, items):
+        """Асинхронный генератор результатов последней стадии в порядке готовности."""
+        output = asyncio.Queue()
+        on_result = self.on_result
+
+        def forward(result):
+            if on_result is not None:
+                on_result(result)
+            output.put_nowait(result)
+
+        self.on_result = forward
+        runner = asyncio.ensure_future(self.run(items))
+        runner.add_done_callback(lambda _: output.put_nowait(_DONE))
+        try:
+            while True:
+                result = await output.get()
+                if result is _DONE:
+                    break
+                yield result
+            await runner  # Пробрасываем ошибку конвейера, если она была
+        finally:
+            self.on_result = on_result
+            if not runner.done():
+                runner.cancel()
+
+    async def run(self, items):
+        queues = [asyncio.Queue(maxsize=stage.workers * QUEUE_SIZE_PER_WORKER) for stage in self.stages]
+        stage_workers = []
+        for index, stage in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            stage_workers.append([
+                asyncio.ensure_future(self._worker(stage, queues[index], outbox))
+                for _ in range(stage.workers)
+            ])
+
+        try:
+            for item in items:
+                await queues[0].put(item)
+
+            # Закрываем стадии по порядку: следующая получает маркеры, когда все воркеры предыдущей закончили
+            for index, stage in enumerate(self.stages):
+                for _ in range(stage.workers):
+                    await queues[index].put(_DONE)
+                await asyncio.gather(*stage_workers[index])
+        finally:
+            for workers in stage_workers:
+                for worker in workers:
+                    worker.cancel()
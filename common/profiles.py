@@ -0,0 +1,204 @@
+# profiles.py — декларативные профили бирж для общего движка (common/engine.py)
+
+import os
+from dataclasses import dataclass, field
+
+from common.window_agg import parse_windows
+
+# Путь к проекту FIW_soft (в нём лежат папки бирж)
+BASE_DIR = "D:/Ilya/My project/FIW_soft/FIW_soft"
+
+# Окна накопленного funding rate по умолчанию, в часах
+DEFAULT_WINDOWS = (24, 48, 168, 720)
+# Переменная окружения с окнами для всех бирж, например FUNDING_WINDOWS=8,24,72,168
+WINDOWS_ENV = "FUNDING_WINDOWS"
+
+
+@dataclass
+class ExchangeProfile:
+    """
+    Всё, чем биржи отличаются друг от друга: клиент ccxt и его опции,
+    размер страницы истории, глубина стакана, параллелизм, рейт-лимит и поддержка пакетных запросов.
+    """
+    name: str  # Имя для вывода: Bybit, Gate.io, ...
+    folder: str  # Папка биржи в проекте: Bybite, Gate, ...
+    file_suffix: str  # funding_results_<suffix>.json, кэши *_<suffix>.json
+    ccxt_class: str  # Класс в ccxt.async_support
+    pairs_file: str  # Список символов от *_getSymbols.py
+    client_options: dict = field(default_factory=dict)
+    warmup_url: str = None  # Лёгкий публичный GET для прогрева соединений (время сервера и т.п.)
+    history_page_size: int = 100  # Записей истории FR за один запрос
+    order_book_limit: int = 5  # Глубина, которую запрашиваем у биржи (некоторые принимают только 20/100)
+    order_book_levels: int = 5  # Сколько уровней учитываем в объёме
+    stream_order_book_limit: int = None  # Глубина WebSocket-стакана (None — по умолчанию биржи)
+    min_side_volume: float = 3000  # Минимальный объём в стакане с каждой стороны (в валюте котировки)
+    concurrency: int = 5  # Базовый параллелизм: воркеры стадий funding и history (стадия book — вдвое больше)
+    stage_workers: dict = None  # Явное число воркеров по стадиям: {'book': ..., 'funding': ..., 'history': ...}
+    # Рейт-лимит: rate — единиц веса в секунду, capacity — всплеск, weights — вес по типу эндпоинта
+    rate_limit: dict = None
+    # Идемпотентные чтения, для которых после p95 без ответа отправляется дублирующий запрос
+    hedged_endpoints: tuple = ()
+    windows: tuple = DEFAULT_WINDOWS
+    bulk_funding: bool = True  # Пакетный fetch_funding_rates (если биржа поддерживает)
+    bulk_tickers: bool = True  # Предфильтр ликвидности по fetch_tickers
+    # Порог оборота за 24ч в предфильтре (в валюте котировки; None — только проверка стакана).
+    # Контракт, по которому за сутки наторговали меньше ~3 объёмов min_side_volume, на практике
+    # не держит min_side_volume в первых уровнях с обеих сторон
+    min_quote_volume_24h: float = 10000
+    next_funding_keys: tuple = ('nextFundingTimestamp',)  # Где искать время следующей выплаты
+    settle_fallback: str = None  # Если символа нет в рынках, пробуем BASE/<settle>:<settle>
+    assumed_interval_hours: int = None  # Если истории нет — оценка сумм по текущему FR с этим интервалом
+    progress_bar: bool = False
+
+    def workers(self, stage: str):
+        """Воркеры стадии конвейера (common/pipeline.py): из stage_workers или по concurrency."""
+        defaults = {'book': 2 * self.concurrency, 'funding': self.concurrency, 'history': self.concurrency}
+        return (self.stage_workers or {}).get(stage, defaults[stage])
+
+    @property
+    def data_dir(self):
+        return f"{BASE_DIR}/{self.folder}"
+
+    @property
+    def history_retention_hours(self):
+        """Глубина кэша истории FR: не короче самого длинного окна, которое может запросить любой профиль."""
+        return max(HISTORY_RETENTION_HOURS, *self.windows)
+
+
+EXCHANGE_PROFILES = {
+    'Bybite': ExchangeProfile(
+        name='Bybit',
+        folder='Bybite',
+        file_suffix='bybite',
+        ccxt_class='bybit',
+        pairs_file='tradePairsBybite.json',
+        client_options={'timeout': 1000, 'options': {'defaultType': 'swap'}},
+        warmup_url='https://api.bybit.com/v5/market/time',
+        history_page_size=200,  # Bybit обычно возвращает до 200 записей за раз
+        # 600 запросов за 5 секунд
+        rate_limit={'rate': 120, 'capacity': 20},
+    ),
+    'Gate': ExchangeProfile(
+        name='Gate.io',
+        folder='Gate',
+        file_suffix='gate',
+        ccxt_class='gateio',
+        pairs_file='tradePairsGate.json',
+        client_options={
+            'timeout': 30000,
+            'options': {
+                'defaultType': 'swap',
+                'fetchCurrencies': False,  # ← Отключаем загрузку спотовых валют
+            },
+        },
+        warmup_url='https://api.gateio.ws/api/v4/spot/time',
+        history_page_size=100,
+        # 200 запросов за 10 секунд на эндпоинт
+        rate_limit={'rate': 20, 'capacity': 10},
+        hedged_endpoints=('order_book', 'funding_history'),  # Редкие медленные ответы тянут весь прогон
+    ),
+    'MexC': ExchangeProfile(
+        name='MEXC',
+        folder='MexC',
+        file_suffix='mexc',
+        ccxt_class='mexc',
+        pairs_file='tradePairsMexc.json',
+        client_options={'timeout': 5000, 'options': {'defaultType': 'swap'}},
+        warmup_url='https://api.mexc.com/api/v1/contract/ping',
+        history_page_size=100,  # API позволяет до 1000, но 100 надёжнее
+        # 20 запросов за 2 секунды
+        rate_limit={'rate': 10, 'capacity': 5},
+    ),
+    'BingX': ExchangeProfile(
+        name='BingX',
+        folder='BingX',
+        file_suffix='bingx',
+        ccxt_class='bingx',
+        pairs_file='tradePairsBingX.json',
+        client_options={'timeout': 30000, 'options': {'defaultType': 'swap'}},
+        warmup_url='https://open-api.bingx.com/openApi/swap/v2/server/time',
+        history_page_size=100,
+        # Консервативно, по rateLimit из ccxt (100 мс)
+        rate_limit={'rate': 10, 'capacity': 5},
+        hedged_endpoints=('order_book', 'funding_history'),
+    ),
+    'Htx': ExchangeProfile(
+        name='HTX',
+        folder='Htx',
+        file_suffix='htx',
+        ccxt_class='htx',
+        pairs_file='tradePairsHtx.json',
+        # SSL проверяется по сертификатам certifi (common/http_session.py), отключать проверку не нужно
+        client_options={'timeout': 3000, 'options': {'defaultType': 'swap'}},
+        warmup_url='https://api.hbdm.com/api/v1/timestamp',
+        history_page_size=100,
+        order_book_limit=20,  # HTX может требовать limit = 20, 100 или другие значения
+        # Консервативно, по rateLimit из ccxt (100 мс)
+        rate_limit={'rate': 10, 'capacity': 5},
+        windows=(24, 48, 168),
+    ),
+    'KuCoin': ExchangeProfile(
+        name='KuCoin',
+        folder='KuCoin',
+        file_suffix='kucoin',
+        ccxt_class='kucoinfutures',
+        pairs_file='tradePairsKuCoin.json',
+        client_options={'timeout': 3000},
+        warmup_url='https://api-futures.kucoin.com/api/v1/timestamp',
+        history_page_size=100,
+        order_book_limit=20,  # KuCoin требует limit = 20 или 100
+        # Общий пул 2000 единиц веса за 30 секунд
+        rate_limit={
+            'rate': 66,
+            'capacity': 100,
+            'weights': {
+                'order_book': 5,
+                'funding_rate': 2,
+                'funding_rates': 3,
+                'funding_history': 5,
+                'tickers': 5,
+            },
+        },
+    ),
+    'Hyper': ExchangeProfile(
+        name='Hyperliquid',
+        folder='Hyper',
+        file_suffix='hyper',
+        ccxt_class='hyperliquid',
+        pairs_file='tradePairsHyper.json',
+        client_options={'timeout': 3000},
+        warmup_url='https://api.hyperliquid.xyz/info',  # Только POST; GET всё равно открывает соединение
+        history_page_size=500,  # fundingHistory отдаёт до 500 записей за запрос
+        # 1200 единиц веса в минуту; l2Book — 2, остальные info-запросы — 20
+        rate_limit={
+            'rate': 20,
+            'capacity': 60,
+            'weights': {
+                'order_book': 2,
+                'funding_rate': 20,
+                'funding_rates': 20,
+                'funding_history': 20,
+                'tickers': 20,
+            },
+        },
+        next_funding_keys=('fundingTimestamp', 'nextFundingTimestamp'),
+        settle_fallback='USDC',  # Perpetual на Hyperliquid — BASE/USDC:USDC
+        assumed_interval_hours=1,  # Часто 1ч на Hyperliquid
+        progress_bar=True,
+    ),
+}
+
+# Самое длинное окно из окон по умолчанию и профилей. Кэш истории не урезается короче него,
+# даже если запуск считает только короткие окна (--windows / FUNDING_WINDOWS): иначе следующий
+# обычный запуск дозапросил бы только новые записи и посчитал длинные окна по обрезанной истории
+HISTORY_RETENTION_HOURS = max(*DEFAULT_WINDOWS, *(hours for profile in EXCHANGE_PROFILES.values() for hours in profile.windows))
+
+
+def configure_windows(windows: tuple):
+    """Задаёт одинаковый набор окон (в часах) всем профилям — вместо окон по умолчанию и из профилей."""
+    for profile in EXCHANGE_PROFILES.values():
+        profile.windows = tuple(windows)
+
+
+if os.environ.get(WINDOWS_ENV):
+    configure_windows(parse_windows(os.environ[WINDOWS_ENV]))
@@ -0,0 +1,134 @@
+# publish.py — атомарная публикация файлов результатов и версионированные снимки с указателем latest
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Сколько последних снимков каждого файла хранить в папке snapshots
+KEEP_SNAPSHOTS = 5
+
+# umask процесса читается один раз при импорте: os.umask меняет его для всех потоков
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _fsync_dir(directory: Path):
+    """fsync каталога, чтобы переименование пережило сбой питания (на Windows каталог так не открыть — пропускаем)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _replace_with(path: Path, write, before_replace=None):
+    """
+    Пишет во временный файл рядом с path через write(f), делает fsync и переименовывает поверх path.
+    before_replace(tmp_path) вызывается перед rename — всё, что меняет файл, должно случиться до публикации.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp создаёт файл с правами 0600; публикуемый файл читают веб-сервер и фронтенд от других пользователей
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        if before_replace is not None:
+            before_replace(tmp_path)
+        os.replace(tmp_path, path)  # Атомарно: читатель видит либо старый файл, либо новый целиком
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+
+def atomic_write_json(path, data, indent: int = 4):
+    """json.dump в path так, что читатель никогда не увидит недописанный файл."""
+    payload = json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+    _replace_with(Path(path), lambda f: f.write(payload))
+
+
+def atomic_copy(src_path, dest_path):
+    """Копирует src_path в dest_path через временный файл и rename (вместо shutil.copy2 поверх живого файла)."""
+    src_path = Path(src_path)
+    dest_path = Path(dest_path)
+
+    def write(f):
+        with open(src_path, "rb") as src:
+            shutil.copyfileobj(src, f)
+
+    # Метаданные копируются на временный файл: после rename dest_path уже никто не трогает
+    _replace_with(dest_path, write, before_replace=lambda tmp_path: shutil.copystat(src_path, tmp_path))
+
+
+def latest_pointer_path(directory, name: str):
+    return Path(directory) / f"{name}.latest.json"
+
+
+def read_latest(directory, name: str):
+    """Указатель на последний снимок {'version', 'generatedAt', 'path'} или None, если снимков ещё не было."""
+    try:
+        with open(latest_pointer_path(directory, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _latest_snapshot_version(directory: Path, name: str) -> int:
+    """Наибольшая версия среди файлов snapshots/<name>.v*.json (0, если их нет)."""
+    latest = 0
+    for snapshot in (directory / "snapshots").glob(f"{name}.v*.json"):
+        try:
+            latest = max(latest, int(snapshot.name[len(name) + 2:-len(".json")]))
+        except ValueError:
+            continue
+    return latest
+
+
+def publish_snapshot(data, directory, name: str, keep: int = KEEP_SNAPSHOTS):
+    """
+    Публикует данные как очередной снимок:
+      1. snapshots/<name>.v<версия>.json — неизменяемый файл снимка;
+      2. <name>.latest.json — указатель на него с монотонной версией и временем генерации;
+      3. <name>.json — прежний путь для существующих читателей.
+    Всё пишется атомарно; потребитель, читающий указатель, переключается между снимками целиком.
+    Возвращает указатель.
+    """
+    directory = Path(directory)
+    previous = read_latest(directory, name)
+    # Указатель мог пропасть или испортиться: версия не должна начинаться заново поверх уже опубликованных снимков
+    previous_version = previous.get('version', 0) if isinstance(previous, dict) else 0
+    version = max(previous_version, _latest_snapshot_version(directory, name)) + 1
+
+    snapshot_relpath = f"snapshots/{name}.v{version:06d}.json"
+    atomic_write_json(directory / snapshot_relpath, data)
+
+    pointer = {
+        'version': version,
+        'generatedAt': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'path': snapshot_relpath,
+    }
+    atomic_write_json(latest_pointer_path(directory, name), pointer)
+    atomic_write_json(directory / f"{name}.json", data)
+
+    # Старые снимки больше не нужны: читатели открывают файл по указателю, а он уже сменился
+    for old_snapshot in sorted((directory / "snapshots").glob(f"{name}.v*.json"))[:-keep]:
+        try:
+            old_snapshot.unlink()
+        except OSError:
+            pass
+
+    return pointer
@@ -0,0 +1,228 @@
+# ranking.py — топ-N пар по окнам фандинга для скриптов *_sorting.py, run_all_top10.py и run_global_top10.py
+
+import argparse
+import heapq
+import json
+from itertools import count
+from pathlib import Path
+
+from common.coin_index import base_asset
+from common.profiles import DEFAULT_WINDOWS, EXCHANGE_PROFILES
+from common.publish import atomic_write_json
+from common.results_sink import read_partial_results
+from common.symbol_registry import SymbolRegistry
+from common.top_index import ORDERS, passes_filters, window_hours, window_keys
+from common.window_agg import parse_windows
+
+DEFAULT_TOP_N = 10
+# Окна, ключи которых есть в result.json всегда (их читает фронтенд), даже если у биржи таких данных нет
+DEFAULT_RANK_WINDOWS = tuple(f"{hours}h" for hours in DEFAULT_WINDOWS)
+
+
+def results_path(profile, base_dir=None):
+    """
+    funding_results_<suffix>.json биржи — имя берётся из профиля, а не угадывается по имени папки
+    (Bybit пишет funding_results_bybite.json). base_dir — папка проекта, по умолчанию из профиля.
+    """
+    directory = Path(base_dir) / profile.folder if base_dir is not None else Path(profile.data_dir)
+    return directory / f"funding_results_{profile.file_suffix}.json"
+
+
+def partial_results_path(path):
+    """funding_results_<suffix>.jsonl, который движок дописывает по ходу прогона (common/results_sink.py)."""
+    return Path(path).with_suffix(".jsonl")
+
+
+def load_results(path):
+    """
+    Результаты одной биржи {symbol: запись}; при ошибке — пустой словарь с сообщением.
+    Если итогового файла ещё нет (первый прогон не закончился или упал), читаются
+    частичные результаты из funding_results_<suffix>.jsonl.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        partial = read_partial_results(partial_results_path(path))
+        if partial:
+            print(f"[WARNING] Файл {path} не найден, использую частичные результаты "
+                  f"{partial_results_path(path)} ({len(partial)} символов).")
+            return partial
+        print(f"[WARNING] Файл {path} не найден.")
+    except json.JSONDecodeError:
+        print(f"[ERROR] Файл {path} повреждён или не является JSON.")
+    return {}
+
+
+def load_all_results(base_dir):
+    """Результаты всех бирж {папка биржи: {symbol: запись}} (пустые и отсутствующие файлы пропускаются)."""
+    all_results = {}
+    for profile in EXCHANGE_PROFILES.values():
+        path = results_path(profile, base_dir)
+        if not path.exists() and not partial_results_path(path).exists():
+            print(f"[WARNING] Файл funding_results не найден: {path}")
+            continue
+        print(f"[INFO] Загружаю данные из {path} (биржа: {profile.folder})...")
+        data = load_results(path)
+        if data:
+            all_results[profile.folder] = data
+    return all_results
+
+
+def available_windows(records):
+    """Все окна ('24h', '48h', ...), встречающиеся в записях, по возрастанию длины."""
+    windows = set()
+    for record in records:
+        windows.update(window_keys(record))
+    return sorted(windows, key=window_hours)
+
+
+def default_windows(records):
+    """Окна по умолчанию для топов: DEFAULT_RANK_WINDOWS плюс другие окна из записей (FUNDING_WINDOWS)."""
+    return sorted({*DEFAULT_RANK_WINDOWS, *available_windows(records)}, key=window_hours)
+
+
+def top_entries(entries, windows, n: int = DEFAULT_TOP_N, order: str = 'desc',
+                min_ask_volume: float = None, min_bid_volume: float = None, interval: float = None):
+    """
+    Топ-n по каждому окну за один проход по entries [(биржа, symbol, запись)].
+    На каждое окно — куча из n лучших (частичный отбор, как heapq.nlargest): O(записи × окна × log n)
+    вместо полной сортировки на каждое окно. Записи без значения окна в его топ не попадают.
+    Возвращает {окно: [(значение, биржа, symbol, запись), ...]} в порядке order.
+    """
+    if order not in ORDERS:
+        raise ValueError(f"order должен быть одним из: {', '.join(ORDERS)}")
+    sign = 1 if order == 'desc' else -1  # Для asc храним самые отрицательные как самые «большие»
+    heaps = {window: [] for window in windows}
+    tiebreak = count()  # Равные значения: раньше встреченная запись выше, записи между собой не сравниваются
+
+    for exchange, symbol, record in entries:
+        if not passes_filters(record, min_ask_volume, min_bid_volume, interval):
+            continue
+        for window, heap in heaps.items():
+            value = record.get(window)
+            if not isinstance(value, (int, float)):
+                continue
+            item = (sign * value, -next(tiebreak), exchange, symbol, record)
+            if len(heap) < n:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+    return {
+        window: [(sign * key, exchange, symbol, record)
+                 for key, _, exchange, symbol, record in sorted(heap, reverse=True)]
+        for window, heap in heaps.items()
+    }
+
+
+def rank_exchange(data: dict, windows=None, n: int = DEFAULT_TOP_N, order: str = 'desc', **filters):
+    """
+    Топ одной биржи: {'top_<n>_by_<окно>': {symbol: запись}} (формат result.json).
+    Окно без данных у биржи (например, 720h у HTX) даёт пустой словарь, а не пропадает из файла.
+    """
+    windows = windows or default_windows(data.values())
+    tops = top_entries(((None, symbol, record) for symbol, record in data.items()), windows, n, order, **filters)
+    return {f"top_{n}_by_{window}": {symbol: record for _, _, symbol, record in top} for window, top in tops.items()}
+
+
+def rank_global(all_results: dict, windows=None, n: int = DEFAULT_TOP_N, order: str = 'desc', registry=None, **filters):
+    """
+    Общий топ по всем биржам: {'top_<n>_by_<окно>': [{'symbol', 'data', 'exchange', 'asset', 'multiplier'}, ...]}.
+    asset/multiplier — из реестра символов (без него — базовый актив символа и 1).
+    """
+    windows = windows or default_windows(record for data in all_results.values() for record in data.values())
+    entries = ((exchange, symbol, record) for exchange, data in all_results.items() for symbol, record in data.items())
+    tops = top_entries(entries, windows, n, order, **filters)
+    return {
+        f"top_{n}_by_{window}": [
+            {'symbol': symbol, 'data': record, 'exchange': exchange, **_asset_fields(exchange, symbol, registry)}
+            for _, exchange, symbol, record in top
+        ]
+        for window, top in tops.items()
+    }
+
+
+def _asset_fields(exchange: str, symbol: str, registry):
+    if registry is None:
+        return {'asset': base_asset(symbol), 'multiplier': 1}
+    asset, multiplier = registry.resolve(exchange, symbol)
+    return {'asset': asset, 'multiplier': multiplier}
+
+
+def add_ranking_arguments(parser):
+    """Общие параметры CLI ранжирования."""
+    parser.add_argument("--windows", type=parse_windows, default=None,
+                        help="окна в часах через запятую, например 24,48,168 (по умолчанию — 24,48,168,720 и другие окна в данных)")
+    parser.add_argument("-n", "--top", type=int, default=DEFAULT_TOP_N, help="сколько пар в каждом топе")
+    parser.add_argument("--order", choices=ORDERS, default='desc',
+                        help="desc — самый высокий фандинг первым (для лонгов), asc — самый отрицательный (для шортов)")
+    parser.add_argument("--min-ask-volume", type=float, default=None, help="минимальный объём асков в стакане")
+    parser.add_argument("--min-bid-volume", type=float, default=None, help="минимальный объём бидов в стакане")
+    parser.add_argument("--interval", type=float, default=None, help="только пары с этим интервалом выплат, ч")
+    return parser
+
+
+def ranking_options(args):
+    """Параметры rank_exchange/rank_global из разобранных аргументов CLI."""
+    return {
+        'windows': [f"{hours}h" for hours in args.windows] if args.windows else None,
+        'n': args.top,
+        'order': args.order,
+        'min_ask_volume': args.min_ask_volume,
+        'min_bid_volume': args.min_bid_volume,
+        'interval': args.interval,
+    }
+
+
+def print_top_list(title: str, entries, window: str, show_exchange: bool = False, registry=None, exchange: str = None):
+    """
+    Таблица топа: entries — [(symbol, запись)] или [(symbol, запись, биржа)] при show_exchange.
+    Актив — канонический из реестра символов registry (для одной биржи — с именем exchange), иначе из символа.
+    """
+    width = 120 if show_exchange else 110
+    exchange_header = f" | {'Биржа':<10}" if show_exchange else ""
+    print(f"\n{title}:")
+    print("-" * width)
+    print(f"{'Актив':<10}{exchange_header} | {'FR (накопл.)':>12} | {'Текущий FR':>12} | {'Интервал':>9} | {'Ask Vol':>12} | {'Bid Vol':>12}")
+    print("-" * width)
+    for symbol, values, *entry_exchange in entries:
+        symbol_exchange = entry_exchange[0] if entry_exchange else exchange
+        base = registry.asset(symbol_exchange or '', symbol) if registry is not None else base_asset(symbol)
+        exchange_column = f" | {symbol_exchange:<10}" if show_exchange else ""
+        fr_val = values.get(window, 0)
+        cur_fr = values.get('currentFR', None)
+        interval = values.get('fundingIntervalHours', '?')
+        ask_vol = values.get('askTotalVolume', 0)
+        bid_vol = values.get('bidTotalVolume', 0)
+        cur_fr_str = f"{cur_fr:>7.4f}%" if cur_fr is not None else "    N/A"
+        print(f"{base:<10}{exchange_column} | {fr_val:>11.4f}% | {cur_fr_str:>12} | {interval!s:>8}ч | {ask_vol:>12.2f} | {bid_vol:>12.2f}")
+
+
+def sorting_cli(profile_key: str, argv=None):
+    """CLI *_sorting.py: топ одной биржи в консоль и в top<n>_sorted_funding_results_<suffix>.json."""
+    profile = EXCHANGE_PROFILES[profile_key]
+    parser = add_ranking_arguments(argparse.ArgumentParser(description=f"Топ пар по funding rate — {profile.name}"))
+    options = ranking_options(parser.parse_args(argv))
+
+    input_file = results_path(profile)
+    data = load_results(input_file)
+    if not data:
+        print("Файл данных пуст или не содержит результатов.")
+        return
+
+    ranked = rank_exchange(data, **options)
+    registry = SymbolRegistry.load()
+    n = options['n']
+    order_title = "по убыванию" if options['order'] == 'desc' else "по возрастанию"
+    for key, top in ranked.items():
+        window = key.rsplit('_', 1)[-1]
+        print_top_list(f"Топ-{n} по Funding Rate ({window}, {order_title}) — {profile.name}", top.items(), window,
+                       registry=registry, exchange=profile.folder)
+
+    output_file = f"{profile.data_dir}/top{n}_sorted_funding_results_{profile.file_suffix}.json"
+    try:
+        atomic_write_json(output_file, ranked)
+        print(f"\nТоп-{n} {profile.name} сохранён в: {output_file}")
+    except Exception as e:
+        print(f"Ошибка при сохранении файла: {e}")
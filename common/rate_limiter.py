@@ -0,0 +1,57 @@
+# rate_limiter.py — общий асинхронный token bucket для всех запросов к одной бирже
+
+import asyncio
+import time
+
+# Запас относительно документированного лимита
+SAFETY_FACTOR = 0.8
+
+
+class TokenBucket:
+    """
+    Асинхронный token bucket, общий для всех корутин одной биржи.
+    Ожидающие обслуживаются по очереди под asyncio.Lock, поэтому запросы
+    равномерно распределяются во времени, а не срываются пачкой после одинаковой задержки.
+    """
+
+    def __init__(self, rate: float, capacity: float, weights: dict = None):
+        self.rate = rate  # единиц веса в секунду
+        self.capacity = capacity
+        self.weights = weights or {}
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict = None, fallback_rate_limit_ms: float = 100, safety_factor: float = SAFETY_FACTOR):
+        """
+        Создаёт лимитер по документированным лимитам биржи из профиля
+        ({'rate': ..., 'capacity': ..., 'weights': {...}}, см. common/profiles.py).
+        Без конфигурации берётся rateLimit клиента ccxt (мс между запросами).
+        """
+        if config is None:
+            rate = 1000 / fallback_rate_limit_ms
+            return cls(rate=rate * safety_factor, capacity=max(1, rate))
+        return cls(
+            rate=config['rate'] * safety_factor,
+            capacity=config['capacity'],
+            weights=config.get('weights'),
+        )
+
+    def __str__(self):
+        return f"{self.rate:.1f} ед./с, всплеск до {self.capacity}"
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, endpoint: str = 'default'):
+        """Ждёт, пока в ведре не наберётся вес запроса к endpoint, и списывает его."""
+        weight = self.weights.get(endpoint, 1)
+        async with self.lock:
+            self._refill()
+            if self.tokens < weight:
+                await asyncio.sleep((weight - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= weight
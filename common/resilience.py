@@ -0,0 +1,208 @@
+# resilience.py — повторы с backoff для временных ошибок и circuit breaker на биржу
+
+import asyncio
+import random
+import time
+from collections import deque
+
+import ccxt.async_support as ccxt
+
+# Повторы временных ошибок: сколько раз и с какой задержкой (экспоненциальная, со случайным разбросом)
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10
+
+# Breaker: по последним BREAKER_WINDOW запросам; размыкается, если доля ошибок не меньше BREAKER_FAILURE_RATIO
+BREAKER_WINDOW = 20
+BREAKER_MIN_REQUESTS = 10
+BREAKER_FAILURE_RATIO = 0.5
+# Сколько ждать до пробных запросов и сколько пробных запросов пускать одновременно
+BREAKER_COOLDOWN_SECONDS = 30
+BREAKER_PROBE_REQUESTS = 1
+
+
+class CircuitOpenError(Exception):
+    """Биржа считается недоступной: запрос отклонён без обращения к ней."""
+
+
+def is_transient(error):
+    """
+    Временная ли ошибка: сетевые сбои, таймауты, перегрузка и обслуживание биржи (ccxt.NetworkError).
+    Ошибки запроса (неизвестный символ, неверные параметры и т.п.) повторять бессмысленно.
+    """
+    return isinstance(error, (ccxt.NetworkError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker одной биржи.
+    closed — запросы идут как обычно; open — отклоняются сразу (CircuitOpenError);
+    half_open — после паузы пропускается BREAKER_PROBE_REQUESTS пробных запросов:
+    успех замыкает breaker, ошибка снова размыкает.
+    """
+
+    def __init__(self, name: str, window: int = BREAKER_WINDOW, min_requests: int = BREAKER_MIN_REQUESTS,
+                 failure_ratio: float = BREAKER_FAILURE_RATIO, cooldown_seconds: float = BREAKER_COOLDOWN_SECONDS,
+                 probe_requests: int = BREAKER_PROBE_REQUESTS):
+        self.name = name
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.cooldown_seconds = cooldown_seconds
+        self.probe_requests = probe_requests
+        self.outcomes = deque(maxlen=window)  # True — успех, False — временная ошибка
+        self.state = 'closed'
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_request(self):
+        """Пропускает запрос или бросает CircuitOpenError. Возвращает True, если запрос пробный."""
+        if self.state == 'open':
+            if time.monotonic() - self.opened_at < self.cooldown_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name}: биржа временно отключена после серии ошибок")
+            self.state = 'half_open'
+            print(f"{self.name}: пробные запросы после паузы")
+
+        if self.state == 'half_open':
+            if self.probes_in_flight >= self.probe_requests:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name}: ожидается результат пробного запроса")
+            self.probes_in_flight += 1
+            return True
+        return False
+
+    def record_success(self, probe: bool = False):
+        if probe:
+            self.probes_in_flight -= 1
+        if self.state == 'half_open' and probe:
+            self.state = 'closed'
+            self.outcomes.clear()
+            print(f"{self.name}: биржа снова доступна")
+        self.outcomes.append(True)
+
+    def record_failure(self, probe: bool = False):
+        if probe:
+            self.probes_in_flight -= 1
+            if self.state == 'half_open':
+                self._open()
+            return
+        self.outcomes.append(False)
+        failures = self.outcomes.count(False)
+        if self.state == 'closed' and len(self.outcomes) >= self.min_requests \
+                and failures / len(self.outcomes) >= self.failure_ratio:
+            self._open()
+
+    def record_neutral(self, probe: bool = False):
+        """Запрос завершился ошибкой, не связанной со здоровьем биржи: пробный слот освобождается."""
+        if probe:
+            self.probes_in_flight -= 1
+
+    def _open(self):
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        print(f"{self.name}: слишком много ошибок, запросы приостановлены на {self.cooldown_seconds} с")
+
+    def __str__(self):
+        return f"состояние {self.state}, размыкался {self.times_opened} раз, отклонено запросов {self.rejected}"
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SECONDS, cap: float = BACKOFF_MAX_SECONDS):
+    """Задержка перед повтором attempt (с 0): случайная в [0, min(cap, base * 2^attempt)] — «full jitter»."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class RequestGuard:
+    """
+    Единая точка запросов к бирже: рейт-лимит, circuit breaker и повторы временных ошибок.
+    Если передан latency (common/latency.py), каждый запрос замеряется и ограничивается
+    адаптивным таймаутом, а для hedged_endpoints (идемпотентные чтения) после p95 без ответа
+    отправляется дублирующий запрос — берётся тот ответ, что пришёл раньше.
+    Ошибки, которые не помогли повторы, и CircuitOpenError пробрасываются вызывающему.
+    """
+
+    def __init__(self, rate_limiter, breaker: CircuitBreaker, max_retries: int = MAX_RETRIES,
+                 latency=None, hedged_endpoints: tuple = ()):
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.latency = latency
+        self.hedged_endpoints = set(hedged_endpoints)
+
+    async def _timed(self, endpoint: str, method, args, kwargs):
+        """Один запрос с адаптивным таймаутом; задержка попадает в гистограмму (кроме отменённых дублей)."""
+        if self.latency is None:
+            return await method(*args, **kwargs)
+        started_at = time.monotonic()
+        try:
+            result = await asyncio.wait_for(method(*args, **kwargs), self.latency.timeout_for(endpoint))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.latency.record(endpoint, time.monotonic() - started_at)
+            raise
+        self.latency.record(endpoint, time.monotonic() - started_at)
+        return result
+
+    async def _request(self, endpoint: str, method, args, kwargs):
+        hedge_delay = self.latency.hedge_delay(endpoint) if self.latency and endpoint in self.hedged_endpoints else None
+        if hedge_delay is None:
+            return await self._timed(endpoint, method, args, kwargs)
+
+        primary = asyncio.ensure_future(self._timed(endpoint, method, args, kwargs))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            # Основной запрос дольше p95 — отправляем дубль (он тоже проходит через рейт-лимит)
+            await self.rate_limiter.acquire(endpoint)
+        except asyncio.CancelledError:
+            primary.cancel()  # Вызывающий отменён — основной запрос никому не нужен
+            raise
+        self.latency.hedges_sent[endpoint] += 1
+        hedge = asyncio.ensure_future(self._timed(endpoint, method, args, kwargs))
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.latency.hedges_won[endpoint] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, endpoint: str, method, *args, **kwargs):
+        attempt = 0
+        while True:
+            probe = self.breaker.before_request()
+            try:
+                # Ожидание рейт-лимита — внутри try: при отмене пробный слот breaker должен освободиться
+                await self.rate_limiter.acquire(endpoint)
+                result = await self._request(endpoint, method, args, kwargs)
+            except asyncio.CancelledError:
+                self.breaker.record_neutral(probe)
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.record_neutral(probe)
+                    raise
+                self.breaker.record_failure(probe)
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                print(f"{self.breaker.name}: временная ошибка {endpoint} ({type(e).__name__}), "
+                      f"повтор {attempt + 1}/{self.max_retries} через {delay:.1f} с")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success(probe)
+            return result
@@ -0,0 +1,60 @@
+# results_sink.py — запись результатов по мере готовности символов (JSONL) и чтение частичных результатов
+
+import json
+import os
+
+
+class JsonlSink:
+    """
+    Дописывает запись каждого готового символа отдельной строкой JSONL ({"symbol": ..., поля записи}).
+    Файл открывается заново (пустым) в начале прогона; после сбоя в нём остаются все символы,
+    обработанные до сбоя. Ранжирование (common/ranking.load_results) читает его через
+    read_partial_results, пока итогового funding_results_<suffix>.json ещё нет.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.count = 0
+
+    def open(self):
+        self.file = open(self.path, "w", encoding="utf-8")
+        self.count = 0
+
+    def append(self, symbol: str, record: dict):
+        self.file.write(json.dumps({'symbol': symbol, **record}, ensure_ascii=False) + "\n")
+        self.file.flush()  # Строка видна читателям и переживает падение процесса
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def read_partial_results(path):
+    """
+    Результаты из JSONL в формате funding_results_*.json: {symbol: запись}.
+    Неполная последняя строка (файл дописывается прямо сейчас) пропускается.
+    """
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            symbol = record.pop('symbol', None)
+            if symbol is not None:
+                results[symbol] = record
+    return results
@@ -0,0 +1,142 @@
+# streaming.py — потоковый режим: живое представление FR и объёма стакана по WebSocket (ccxt.pro)
+
+import asyncio
+from datetime import datetime
+
+import ccxt.pro as ccxtpro
+
+from common.bulk import fetch_funding_snapshot, filter_liquid_symbols
+from common.engine import FundingEngine, book_volumes, parse_funding_rate
+from common.markets_cache import MarketsCache
+from common.publish import atomic_write_json
+
+# Как часто опрашивать пакетный fetch_funding_rates, если у биржи нет WebSocket-канала funding rate
+FUNDING_POLL_SECONDS = 60
+
+# Пауза перед повторной подпиской после ошибки соединения
+RESUBSCRIBE_DELAY_SECONDS = 5
+
+
+class LiveView:
+    """
+    Живое состояние по символам одной биржи: currentFR, nextFundingTime,
+    askTotalVolume / bidTotalVolume (первые уровни стакана) и время последнего обновления.
+    Обновляется из корутин одного event loop, поэтому блокировки не нужны.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    def update(self, symbol: str, **fields):
+        entry = self.data.setdefault(symbol, {})
+        entry.update(fields)
+        entry['updatedAt'] = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+
+    def snapshot(self):
+        """Копия текущего состояния (её можно сериализовать, пока потоки продолжают обновлять data)."""
+        return {symbol: dict(entry) for symbol, entry in self.data.items()}
+
+    def save(self, path):
+        """Атомарно: файл перезаписывается каждые несколько секунд, читатель не должен застать его недописанным."""
+        try:
+            atomic_write_json(path, self.snapshot())
+        except Exception as e:
+            print(f"Ошибка сохранения живого представления в {path}: {e}")
+
+
+class StreamingEngine(FundingEngine):
+    """
+    Долгоживущий сбор по WebSocket: стакан каждого символа и funding rate.
+    Список символов и предфильтр ликвидности — те же, что у FundingEngine (один REST-запрос тикеров при старте).
+    Если у биржи нет WebSocket-канала funding rate, текущий FR раз в FUNDING_POLL_SECONDS
+    берётся одним пакетным REST-запросом fetch_funding_rates.
+    replay — воспроизведение записи (common/ws_replay.py) без сети: без прогрева соединений,
+    предфильтра тикеров и опроса FR, рынки — только из кэша.
+    """
+
+    def __init__(self, profile, replay: bool = False):
+        super().__init__(profile, ccxt_module=ccxtpro)
+        self.live_view = LiveView()
+        self.replay = replay
+
+    @property
+    def live_view_path(self):
+        return f"{self.profile.data_dir}/live_view_{self.profile.file_suffix}.json"
+
+    def apply_funding(self, symbol: str, fr_data):
+        current_funding, next_funding_time_str = parse_funding_rate(fr_data, self.profile.next_funding_keys)
+        self.live_view.update(
+            symbol,
+            currentFR=round(current_funding, 6) if current_funding is not None else None,
+            nextFundingTime=next_funding_time_str,
+        )
+
+    async def watch_book(self, symbol: str):
+        while True:
+            try:
+                order_book = await self.exchange.watch_order_book(symbol, self.profile.stream_order_book_limit)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ошибка потока стакана {symbol} на {self.profile.name}: {e}")
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+                continue
+            ask_total, bid_total = book_volumes(order_book, self.profile.order_book_levels)
+            self.live_view.update(symbol, askTotalVolume=round(ask_total, 2), bidTotalVolume=round(bid_total, 2))
+
+    async def watch_funding(self, symbol: str):
+        while True:
+            try:
+                fr_data = await self.exchange.watch_funding_rate(symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Ошибка потока FR {symbol} на {self.profile.name}: {e}")
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+                continue
+            self.apply_funding(symbol, fr_data)
+
+    async def poll_funding(self, symbols: list):
+        while True:
+            funding_snapshot = await fetch_funding_snapshot(self.exchange, symbols, self.guard)
+            for symbol, fr_data in funding_snapshot.items():
+                self.apply_funding(symbol, fr_data)
+            await asyncio.sleep(FUNDING_POLL_SECONDS)
+
+    def load_cached_markets(self):
+        """Рынки для воспроизведения: из кэша любой давности, без запроса к бирже."""
+        if MarketsCache(self.markets_cache.path, ttl_seconds=float('inf')).apply(self.exchange):
+            return True
+        print(f"{self.profile.name}: для воспроизведения нужен кэш рынков {self.markets_cache.path} "
+              f"(запустите поток или *_fetch_funding.py без --replay)")
+        return False
+
+    async def run(self):
+        """Подписывается на потоки всех символов и работает до отмены задачи."""
+        profile = self.profile
+        try:
+            if self.replay:
+                if not self.load_cached_markets():
+                    return
+            else:
+                await self.open_session()
+                await self.markets_cache.load(self.exchange)
+            symbols = self.load_symbols()
+            if not symbols:
+                print(f"Нет символов для потока на {profile.name}!")
+                return
+            if profile.bulk_tickers and not self.replay:
+                symbols = await filter_liquid_symbols(self.exchange, symbols, self.guard, profile.min_quote_volume_24h)
+
+            tasks = [self.watch_book(symbol) for symbol in symbols]
+            if self.exchange.has.get('watchFundingRate'):
+                tasks += [self.watch_funding(symbol) for symbol in symbols]
+            elif self.replay:
+                print(f"{profile.name}: канала funding rate нет, при воспроизведении FR не обновляется")
+            else:
+                tasks.append(self.poll_funding(symbols))
+
+            print(f"{profile.name}: поток по {len(symbols)} символам")
+            await asyncio.gather(*tasks)
+        finally:
+            await self.exchange.close()
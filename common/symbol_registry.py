@@ -0,0 +1,183 @@
+# symbol_registry.py — реестр символов: символ биржи <-> канонический актив и множитель контракта
+
+import json
+import re
+
+from common.markets_cache import MarketsCache
+from common.profiles import BASE_DIR, EXCHANGE_PROFILES
+from common.publish import atomic_write_json
+
+# Общий файл реестра; пересобирается вместе со списками символов (run_all_getSymbols.py)
+REGISTRY_PATH = f"{BASE_DIR}/symbol_registry.json"
+
+# 1000PEPE, 1000000MOG — множитель перед активом; SHIB1000 — после
+MULTIPLIER_PREFIX = re.compile(r'^(1(?:0{2,}))([A-Z][A-Z0-9]+)$')
+MULTIPLIER_SUFFIX = re.compile(r'^([A-Z][A-Z0-9]*[A-Z])(1(?:0{2,}))$')
+# kPEPE — так Hyperliquid называет контракты на 1000 монет (в символе ccxt — KPEPE)
+KILO_PREFIX = re.compile(r'^k([A-Z][A-Z0-9]+)$')
+
+
+def split_multiplier(base: str, raw_name: str = None):
+    """
+    Канонический актив и множитель контракта: '1000PEPE' -> ('PEPE', 1000), 'SHIB1000' -> ('SHIB', 1000).
+    raw_name — имя актива на самой бирже (info.name / baseId рынка ccxt): по нему распознаётся kPEPE,
+    который в символе ccxt уже приведён к верхнему регистру и неотличим от актива на K.
+    """
+    if raw_name:
+        match = KILO_PREFIX.match(raw_name)
+        if match:
+            return match.group(1), 1000
+    base = base.upper()
+    match = MULTIPLIER_PREFIX.match(base)
+    if match:
+        return match.group(2), int(match.group(1))
+    match = MULTIPLIER_SUFFIX.match(base)
+    if match:
+        return match.group(1), int(match.group(2))
+    return base, 1
+
+
+def market_raw_name(market: dict):
+    """Имя актива в API биржи из структуры рынка ccxt (если рынок известен)."""
+    if not market:
+        return None
+    info = market.get('info') or {}
+    name = info.get('name') if isinstance(info, dict) else None
+    return name or market.get('baseId')
+
+
+# Имена бирж в разных местах проекта: папка (Bybite) и имя в backend (Bybit) — одна биржа
+EXCHANGE_ALIASES = {'bybit': 'bybite'}
+# Биржи, где контракты на 1000 монет называются kPEPE (в символе ccxt — KPEPE)
+KILO_EXCHANGES = ('hyper',)
+
+
+def _exchange_key(exchange: str):
+    # Регистр имён тоже расходится (MexC/Mexc, Htx/HTX)
+    key = exchange.lower()
+    return EXCHANGE_ALIASES.get(key, key)
+
+
+class SymbolRegistry:
+    """
+    by_symbol: (биржа, символ) -> (актив, множитель); by_asset: актив -> [(биржа, символ, множитель)].
+    Оба направления — поиск в словаре, O(1). Реестр заполняется только при сборке (build_registry)
+    и загрузке с диска; чтение (resolve) его не меняет, поэтому один реестр можно читать из нескольких
+    потоков. Символ, которого нет в реестре, разбирается по правилам split_multiplier при каждом обращении.
+    """
+
+    def __init__(self):
+        self.by_symbol = {}
+        self.by_asset = {}
+
+    def parse(self, exchange: str, symbol: str, market: dict = None):
+        """(актив, множитель) символа по его имени и рынку ccxt, без записи в реестр."""
+        raw_name = market_raw_name(market)
+        asset, multiplier = split_multiplier(symbol.split('/', 1)[0], raw_name)
+        if multiplier == 1 and raw_name is None:
+            kilo_asset = self._kilo_asset(_exchange_key(exchange), asset)
+            if kilo_asset is not None:
+                return kilo_asset, 1000
+        return asset, multiplier
+
+    def _kilo_asset(self, exchange_key: str, base: str):
+        """
+        KPEPE без данных рынка (нет кэша рынков): на бирже из KILO_EXCHANGES это kPEPE, если PEPE
+        торгуется на других биржах, а KPEPE — нет. Так KAS или KAITO остаются самими собой.
+        """
+        if exchange_key not in KILO_EXCHANGES or len(base) < 2 or not base.startswith('K'):
+            return None
+
+        def elsewhere(asset):
+            return any(_exchange_key(exchange) != exchange_key for exchange, _, _ in self.by_asset.get(asset, []))
+
+        return base[1:] if elsewhere(base[1:]) and not elsewhere(base) else None
+
+    def add(self, exchange: str, symbol: str, market: dict = None):
+        return self._store(exchange, symbol, *self.parse(exchange, symbol, market))
+
+    def _store(self, exchange: str, symbol: str, asset: str, multiplier: int):
+        key = (_exchange_key(exchange), symbol)
+        previous = self.by_symbol.get(key)
+        if previous == (asset, multiplier):
+            return previous
+        if previous is not None:
+            # Символ переопределён (например, рынок уточнил kPEPE): убираем его из прежнего актива
+            self.by_asset[previous[0]] = [entry for entry in self.by_asset[previous[0]]
+                                          if (_exchange_key(entry[0]), entry[1]) != key]
+        self.by_asset.setdefault(asset, []).append((exchange, symbol, multiplier))
+        self.by_symbol[key] = (asset, multiplier)
+        return asset, multiplier
+
+    def resolve(self, exchange: str, symbol: str):
+        """(актив, множитель) символа биржи; реестр при этом не меняется."""
+        resolved = self.by_symbol.get((_exchange_key(exchange), symbol))
+        return resolved if resolved is not None else self.parse(exchange, symbol)
+
+    def asset(self, exchange: str, symbol: str):
+        return self.resolve(exchange, symbol)[0]
+
+    def symbols(self, asset: str, exchange: str = None):
+        """Символы актива [(биржа, символ, множитель)], при exchange — только на этой бирже."""
+        entries = self.by_asset.get(asset.upper(), [])
+        if exchange is None:
+            return entries
+        return [entry for entry in entries if _exchange_key(entry[0]) == _exchange_key(exchange)]
+
+    def to_json(self):
+        data = {}
+        for (exchange, symbol), (asset, multiplier) in self.by_symbol.items():
+            data.setdefault(exchange, {})[symbol] = [asset, multiplier]
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict):
+        registry = cls()
+        for exchange, symbols in data.items():
+            for symbol, (asset, multiplier) in symbols.items():
+                registry._store(exchange, symbol, asset, multiplier)
+        return registry
+
+    def save(self, path=REGISTRY_PATH):
+        atomic_write_json(path, self.to_json())
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        """Реестр с диска; без файла — пустой (символы разбираются по правилам при первом обращении)."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_json(json.load(f))
+        except FileNotFoundError:
+            print(f"[ПРЕДУПРЕЖДЕНИЕ] Реестр символов не найден: {path} (соберите его run_all_getSymbols.py)")
+        except (json.JSONDecodeError, ValueError, TypeError):
+            print(f"[ОШИБКА] Реестр символов повреждён: {path}")
+        return cls()
+
+
+def build_registry(base_dir=BASE_DIR):
+    """
+    Собирает реестр по спискам символов *_getSymbols.py (tradePairs*.json) и кэшам рынков бирж:
+    имена активов на бирже (kPEPE) берутся из рынков, даже если кэш уже устарел.
+    """
+    registry = SymbolRegistry()
+    # Биржи с kPEPE — последними: без кэша рынков KPEPE распознаётся по активам других бирж
+    profiles = sorted(EXCHANGE_PROFILES.values(), key=lambda profile: _exchange_key(profile.folder) in KILO_EXCHANGES)
+    for profile in profiles:
+        exchange_dir = f"{base_dir}/{profile.folder}"
+        try:
+            with open(f"{exchange_dir}/{profile.pairs_file}", "r", encoding="utf-8") as f:
+                symbols = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            print(f"[WARNING] Список символов {profile.name} не найден или повреждён: {exchange_dir}/{profile.pairs_file}")
+            continue
+        cached = MarketsCache(f"{exchange_dir}/markets_cache_{profile.file_suffix}.json", ttl_seconds=float('inf')).read()
+        markets = (cached or {}).get('markets') or {}
+        for symbol in symbols:
+            registry.add(profile.folder, symbol, markets.get(symbol))
+    return registry
+
+
+if __name__ == "__main__":
+    registry = build_registry()
+    registry.save()
+    print(f"Реестр символов сохранён: {REGISTRY_PATH} ({len(registry.by_symbol)} символов, {len(registry.by_asset)} активов)")
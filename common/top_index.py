@@ -0,0 +1,79 @@
+# top_index.py — отсортированные индексы по окнам фандинга: топ-N без полной сортировки на каждый запрос
+
+import re
+from collections import defaultdict
+
+# Поля окон в записях результатов: '24h', '48h', '168h', '720h' и любые другие '<часы>h'
+WINDOW_KEY = re.compile(r'^\d+h$')
+ORDERS = ('desc', 'asc')
+
+
+def window_keys(record: dict):
+    return [key for key, value in record.items() if WINDOW_KEY.match(key) and isinstance(value, (int, float))]
+
+
+def window_hours(window: str):
+    return int(window[:-1])
+
+
+def passes_filters(record: dict, min_ask_volume: float = None, min_bid_volume: float = None, interval: float = None):
+    """Фильтры ликвидности стакана и интервала выплат (в часах); None — фильтр не применяется."""
+    if min_ask_volume is not None and (record.get('askTotalVolume') or 0) < min_ask_volume:
+        return False
+    if min_bid_volume is not None and (record.get('bidTotalVolume') or 0) < min_bid_volume:
+        return False
+    if interval is not None and record.get('fundingIntervalHours') != interval:
+        return False
+    return True
+
+
+class TopIndex:
+    """
+    Строится один раз на снимок данных {биржа: {пара: запись}}.
+    by_window: окно -> [(значение, биржа, пара)] по убыванию значения — по всем биржам;
+    by_exchange: (окно, биржа) -> такой же список по одной бирже.
+    Запрос топ-N идёт по готовому списку с начала (или с конца для asc) и останавливается
+    на N-й записи, прошедшей фильтры: O(N + отброшенные фильтрами), без сортировки.
+    Записи без значения окна в его индекс не попадают.
+    """
+
+    def __init__(self, data: dict):
+        self.data = data
+        by_window = defaultdict(list)
+        by_exchange = defaultdict(list)
+        for exchange, pairs in data.items():
+            for pair, record in pairs.items():
+                for window in window_keys(record):
+                    entry = (record[window], exchange, pair)
+                    by_window[window].append(entry)
+                    by_exchange[(window, exchange)].append(entry)
+
+        for entries in (*by_window.values(), *by_exchange.values()):
+            entries.sort(key=lambda entry: entry[0], reverse=True)
+        self.by_window = dict(by_window)
+        self.by_exchange = dict(by_exchange)
+        self.windows = sorted(self.by_window, key=window_hours)
+
+    def top(self, window: str, n: int = 10, exchange: str = None, order: str = 'desc',
+            min_ask_volume: float = None, min_bid_volume: float = None, interval: float = None):
+        """
+        Первые n записей [(значение, биржа, пара)] по окну window.
+        exchange — только одна биржа; order — desc (самый высокий фандинг первым) или asc;
+        min_ask_volume/min_bid_volume — минимальная ликвидность стакана;
+        interval — только пары с таким интервалом фандинга в часах.
+        """
+        if exchange is None:
+            entries = self.by_window.get(window, [])
+        else:
+            entries = self.by_exchange.get((window, exchange), [])
+        if order == 'asc':
+            entries = reversed(entries)
+
+        top = []
+        for entry in entries:
+            if len(top) >= n:
+                break
+            _, entry_exchange, pair = entry
+            if passes_filters(self.data[entry_exchange][pair], min_ask_volume, min_bid_volume, interval):
+                top.append(entry)
+        return top
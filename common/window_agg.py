@@ -0,0 +1,57 @@
+# window_agg.py — суммы funding rate по произвольным окнам через префиксные суммы и бинарный поиск
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+
+def parse_windows(text: str):
+    """'8,24,72h,168' -> (8, 24, 72, 168): окна в часах, без повторов, по возрастанию."""
+    hours = set()
+    for part in text.split(','):
+        part = part.strip().lower().removesuffix('h')
+        if not part:
+            continue
+        if not part.isdigit() or int(part) <= 0:
+            raise ValueError(f"Окно должно быть положительным числом часов: {part!r}")
+        hours.add(int(part))
+    if not hours:
+        raise ValueError("Не задано ни одного окна")
+    return tuple(sorted(hours))
+
+
+class FundingSeries:
+    """
+    История FR одного символа в виде отсортированных массивов timestamps/rates (rates — в %)
+    и столбца накопленных сумм prefix (prefix[i] — сумма первых i ставок).
+    Сумма, число выплат и среднее за любое окно — два бинарных поиска и вычитание,
+    поэтому число окон не влияет на стоимость обработки записи истории.
+    """
+
+    def __init__(self, history: list):
+        history = sorted(history, key=lambda entry: entry['timestamp'])  # Обычно уже отсортирована: O(n)
+        self.timestamps = [entry['timestamp'] for entry in history]
+        self.rates = [entry['fundingRate'] * 100 for entry in history]  # в %
+        self.prefix = [0.0, *accumulate(self.rates)]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _bounds(self, start_ms: int, end_ms: int):
+        """Индексы записей с start_ms < timestamp < end_ms (границы — как в прежнем подсчёте окон)."""
+        return bisect_right(self.timestamps, start_ms), bisect_left(self.timestamps, end_ms)
+
+    def count(self, start_ms: int, end_ms: int):
+        lo, hi = self._bounds(start_ms, end_ms)
+        return max(hi - lo, 0)
+
+    def sum(self, start_ms: int, end_ms: int):
+        lo, hi = self._bounds(start_ms, end_ms)
+        return self.prefix[hi] - self.prefix[lo] if hi > lo else 0.0
+
+    def mean(self, start_ms: int, end_ms: int):
+        count = self.count(start_ms, end_ms)
+        return self.sum(start_ms, end_ms) / count if count else None
+
+    def window_totals(self, timestamps: dict, end_ms: int):
+        """Суммы по окнам {окно: начало окна в мс} -> {окно: сумма FR в %}."""
+        return {window: self.sum(window_start, end_ms) for window, window_start in timestamps.items()}
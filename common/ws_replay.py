@@ -0,0 +1,98 @@
+# ws_replay.py — запись WebSocket-сообщений биржи и локальная подмена биржи, которая их воспроизводит
+
+import asyncio
+import json
+import socket
+
+from aiohttp import WSMsgType, web
+
+
+def record_messages(exchange, path):
+    """
+    Дописывает каждое входящее сообщение клиента ccxt.pro в JSONL-файл (по строке на сообщение).
+    Вызывать до первой подписки: клиент соединения запоминает обработчик при создании.
+    """
+    record_file = open(path, "a", encoding="utf-8")
+    handle_message = exchange.handle_message
+
+    def recording_handle_message(client, message):
+        record_file.write(json.dumps(message, ensure_ascii=False) + "\n")
+        record_file.flush()
+        return handle_message(client, message)
+
+    exchange.handle_message = recording_handle_message
+    return record_file
+
+
+def redirect_to(exchange, url):
+    """Направляет все WebSocket-соединения клиента ccxt.pro на url (локальную подмену биржи)."""
+    client = exchange.client
+    exchange.client = lambda _url: client(url)
+
+
+def block_rest(exchange):
+    """
+    Запрещает клиенту ccxt REST-запросы: при воспроизведении всё должно приходить из записи.
+    Попытка запроса (снимок стакана, токен WebSocket и т.п.) завершается ошибкой, а не уходит в сеть.
+    """
+    async def fetch(url, method='GET', headers=None, body=None):
+        raise ConnectionError(f"REST-запрос {method} {url} недоступен в режиме воспроизведения")
+
+    exchange.fetch = fetch
+
+
+class ReplayServer:
+    """
+    Локальный WebSocket-сервер вместо биржи: после первого сообщения клиента (подписки)
+    отправляет ему записанные record_messages сообщения с паузой delay между ними.
+    Так поток и живое представление проверяются без сети и без нагрузки на биржу.
+    """
+
+    def __init__(self, path, delay: float = 0.01, host: str = "127.0.0.1", port: int = 0):
+        with open(path, "r", encoding="utf-8") as f:
+            self.messages = [line.rstrip("\n") for line in f if line.strip()]
+        self.delay = delay
+        self.host = host
+        self.port = port
+        self.runner = None
+        self.finished = asyncio.Event()  # Все записанные сообщения отправлены
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}/"
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        # Ждём подписку, иначе сообщения придут раньше, чем клиент начнёт их ждать
+        await ws.receive()
+        for message in self.messages:
+            if ws.closed:
+                break
+            await ws.send_str(message)
+            await asyncio.sleep(self.delay)
+        self.finished.set()
+
+        # Запись кончилась — держим соединение, пока клиент его не закроет
+        async for msg in ws:
+            if msg.type == WSMsgType.ERROR:
+                break
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        # Сокет создаём сами: при port=0 порт выбирает ОС, и узнать его можно только у сокета
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        await web.SockSite(self.runner, sock).start()
+        print(f"Воспроизведение {len(self.messages)} сообщений на {self.url}")
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
@@ -1,9 +1,13 @@
 # find_coin_data.py
 
+import argparse
 import json
 import os
 from pathlib import Path
 
+from common.coin_index import MATCH_MODES, CoinIndex
+from common.symbol_registry import SymbolRegistry
+
 # Определяем путь к проекту FIW_soft
 BASE_DIR = Path("D:/Ilya/My project/FIW_soft/FIW_soft")
 
@@ -20,6 +24,8 @@ EXCHANGE_DATA_FILES = {
 
 # Загружаем все данные один раз при старте
 ALL_EXCHANGE_DATA = {}
+# Индекс поиска по загруженным данным (строится в load_exchange_data)
+COIN_INDEX = CoinIndex({})
 
 def load_exchange_data():
     """Загружает данные всех бирж в память при старте скрипта."""
@@ -41,20 +47,25 @@ def load_exchange_data():
         except Exception as e:
             print(f"[ОШИБКА] Проблема с файлом {exchange}: {e}")
             ALL_EXCHANGE_DATA[exchange] = {}
+
+    global COIN_INDEX
+    # Реестр символов: PEPE находит и 1000PEPE на Bybit, и kPEPE на Hyperliquid
+    COIN_INDEX = CoinIndex(ALL_EXCHANGE_DATA, SymbolRegistry.load())
     print("Загрузка завершена.\n")
 
 
-def find_coin_data(coin_name: str):
+def find_coin_data(coin_name: str, match: str = 'exact'):
     """
     Ищет данные по монете на всех биржах.
     coin_name: строка с именем монеты, например 'BTC', 'ETH'.
+    match: exact — базовый актив целиком, prefix — по началу, fuzzy — подстрока актива.
     """
     print(f"\n--- Поиск данных для монеты: {coin_name.upper()} ---\n")
     found_any = False
 
+    pairs_by_exchange = COIN_INDEX.search(coin_name, match)
     for exchange, data in ALL_EXCHANGE_DATA.items():
-        # Ищем пары, содержащие coin_name (регистронезависимо)
-        matches = {pair: info for pair, info in data.items() if coin_name.upper() in pair.upper()}
+        matches = {pair: data[pair] for pair in pairs_by_exchange.get(exchange, [])}
 
         if matches:
             found_any = True
@@ -82,6 +93,11 @@ def find_coin_data(coin_name: str):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Поиск данных о монете по всем биржам")
+    parser.add_argument("--match", choices=MATCH_MODES, default="exact",
+                        help="exact — актив целиком (BTC не находит BTCDOM), prefix — по началу, fuzzy — подстрока")
+    args = parser.parse_args()
+
     load_exchange_data()
     
     print("Скрипт поиска данных о монетах запущен.")
@@ -99,7 +115,7 @@ def main():
             print("Завершение работы скрипта.")
             break
 
-        find_coin_data(coin_to_search)
+        find_coin_data(coin_to_search, args.match)
         print("-" * 40) # Разделитель между поисками
 
 
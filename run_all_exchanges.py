@@ -1,11 +1,19 @@
 # run_all_exchanges.py
+import argparse
 import asyncio
+import importlib.util
 import os
 import sys
+from datetime import datetime
 from pathlib import Path
 from tqdm.asyncio import tqdm  # Импортируем tqdm для асинхронных задач
 
-async def run_script(script_path):
+from common.http_session import SESSION_POOL
+from common.profiles import WINDOWS_ENV, configure_windows
+from common.window_agg import parse_windows
+from run_all_top10 import build_top10, save_result
+
+async def run_script(script_path, env=None):
     """Асинхронно запускает один скрипт."""
     print(f"[INFO] Запускаю {script_path}...")
     try:
@@ -13,7 +21,8 @@ async def run_script(script_path):
         process = await asyncio.create_subprocess_exec(
             sys.executable, script_path,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stderr=asyncio.subprocess.PIPE,
+            env=env
         )
         stdout, stderr = await process.communicate()
 
@@ -30,7 +39,62 @@ async def run_script(script_path):
         print(f"[EXCEPTION] Ошибка при запуске {script_path}: {e}")
         return False
 
+def load_fetcher(script_path):
+    """Импортирует скрипт биржи как модуль (без запуска main)."""
+    script_path = Path(script_path)
+    spec = importlib.util.spec_from_file_location(script_path.stem, script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def run_fetcher(script_path, now):
+    """Запускает сбор данных одной биржи в текущем процессе и возвращает результаты в памяти."""
+    exchange_name = Path(script_path).parent.name  # Имя папки как имя биржи
+    print(f"[INFO] Запускаю {script_path} в текущем процессе...")
+    try:
+        module = load_fetcher(script_path)
+        results = await module.fetch_all(now)
+        module.save_results(results)
+        print(f"[SUCCESS] {script_path} завершён: {len(results)} символов.")
+        return exchange_name, results, True
+    except Exception as e:
+        print(f"[EXCEPTION] Ошибка при выполнении {script_path}: {e}")
+        return exchange_name, None, False
+
+
+async def run_in_process(scripts_to_run, now=None):
+    """
+    Опрашивает все биржи корутинами в одном event loop с общим опорным временем now.
+    Возвращает словарь {биржа: результаты}.
+    """
+    if now is None:
+        now = datetime.now()
+
+    tasks = [run_fetcher(script_path, now) for script_path in scripts_to_run]
+    try:
+        results = await tqdm.gather(*tasks, desc="Опрос бирж", total=len(tasks))
+    finally:
+        await SESSION_POOL.close()
+
+    return {exchange_name: data for exchange_name, data, success in results if success}
+
+
 async def main():
+    parser = argparse.ArgumentParser(description="Сбор funding-данных со всех бирж")
+    parser.add_argument("--subprocess", action="store_true",
+                        help="запускать каждую биржу в отдельном процессе (изоляция вместо общего event loop)")
+    parser.add_argument("--windows", type=parse_windows, default=None,
+                        help="окна накопленного FR в часах через запятую, например 8,24,72,168,720 "
+                             f"(по умолчанию — из профилей или переменной {WINDOWS_ENV})")
+    args = parser.parse_args()
+
+    env = None
+    if args.windows:
+        configure_windows(args.windows)
+        # Подпроцессы читают окна из окружения при импорте common/profiles.py
+        env = {**os.environ, WINDOWS_ENV: ",".join(map(str, args.windows))}
+
     # Определяем директорию, где лежат скрипты бирж
     base_dir = Path(__file__).parent  # Текущая директория (FIW_soft)
     exchange_dirs = [d for d in base_dir.iterdir() if d.is_dir() and d.name != "common"] # Если есть папка "common", исключим её
@@ -53,8 +117,16 @@ async def main():
 
     print(f"[INFO] Найдено {len(scripts_to_run)} скриптов для запуска: {scripts_to_run}")
 
+    if not args.subprocess:
+        all_results = await run_in_process(scripts_to_run)
+        print(f"\n[INFO] Все биржи опрошены. Успешно: {len(all_results)}/{len(scripts_to_run)}.")
+
+        # Топ-10 считаем сразу по результатам в памяти, без повторного чтения файлов
+        save_result({exchange_name: build_top10(data) for exchange_name, data in all_results.items()}, base_dir)
+        return
+
     # Создаём задачи asyncio
-    tasks = [run_script(script_path) for script_path in scripts_to_run]
+    tasks = [run_script(script_path, env) for script_path in scripts_to_run]
 
     # Используем tqdm.gather для отслеживания прогресса
     # tqdm.gather автоматически оборачивает список задач
@@ -4,13 +4,15 @@ import sys
 from pathlib import Path
 from tqdm.asyncio import tqdm
 
+from common.symbol_registry import REGISTRY_PATH, build_registry
+
 async def run_script(script_path):
     """Асинхронно запускает один скрипт."""
     print(f"[INFO] Запускаю {script_path}...")
     try:
         # Запускаем скрипт как подпроцесс
         process = await asyncio.create_subprocess_exec(
-            sys.executable, script_path,
+            sys.executable, script_path, *sys.argv[1:],  # Например, --refresh-markets
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
@@ -64,5 +66,10 @@ async def main():
         total_runs = len(results)
         print(f"\n[INFO] Все скрипты getSymbols завершены. Успешно: {successful_runs}/{total_runs}.")
 
+        # Реестр символов (канонический актив и множитель) пересобирается по свежим спискам символов и рынкам
+        registry = build_registry()
+        registry.save()
+        print(f"[INFO] Реестр символов сохранён: {REGISTRY_PATH} ({len(registry.by_symbol)} символов, {len(registry.by_asset)} активов)")
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
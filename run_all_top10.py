@@ -1,134 +1,49 @@
 # run_all_top10.py
-import asyncio
-import json
-import sys
+import argparse
 from pathlib import Path
-from tqdm.asyncio import tqdm
-from datetime import datetime
 
-async def process_top10_file(file_path):
-    """Обрабатывает один файл top10 и возвращает его содержимое."""
-    exchange_name = file_path.parent.name # Имя папки как имя биржи
-    print(f"[INFO] Обрабатываю файл {file_path} для биржи {exchange_name}...")
+from common.publish import publish_snapshot
+from common.ranking import add_ranking_arguments, load_all_results, rank_exchange, ranking_options
 
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        # Для нового формата файла структура уже содержит все нужные интервалы
-        # {
-        #   "1INCH/USDT:USDT": {
-        #     "24h": -0.2763,
-        #     "48h": -0.6167,
-        #     "168h": -0.542,
-        #     "720h": -0.1264,
-        #     ...
-        #   },
-        #   ...
-        # }
-
-        # Сортируем данные по каждому интервалу и берем топ-10
-        top_24h = {}
-        top_48h = {}
-        top_168h = {}
-        top_720h = {}
+def build_top10(data: dict, **options):
+    """
+    Считает топ-10 по каждому окну для результатов одной биржи: {"top_10_by_24h": {symbol: запись}, ...}.
+    Окна, n, порядок и фильтры — параметры common/ranking.py (по умолчанию все окна в данных, по убыванию).
+    """
+    return rank_exchange(data, **options)
 
-        # Сортировка по каждому интервалу
-        if data:
-            # Сортировка по 24h (по убыванию)
-            sorted_24h = sorted(data.items(), key=lambda item: item[1].get('24h', 0), reverse=True)
-            top_24h = {item[0]: item[1] for item in sorted_24h[:10]}
 
-            # Сортировка по 48h (по убыванию)
-            sorted_48h = sorted(data.items(), key=lambda item: item[1].get('48h', 0), reverse=True)
-            top_48h = {item[0]: item[1] for item in sorted_48h[:10]}
+def save_result(all_exchange_data: dict, base_dir: Path):
+    """Сохраняет топ-10 всех бирж в общий файл result.json."""
+    output_file_name = "result.json"
+    output_file_path = base_dir / output_file_name
 
-            # Сортировка по 168h (по убыванию)
-            sorted_168h = sorted(data.items(), key=lambda item: item[1].get('168h', 0), reverse=True)
-            top_168h = {item[0]: item[1] for item in sorted_168h[:10]}
+    try:
+        # Атомарно, с версионированным снимком и указателем result.latest.json
+        pointer = publish_snapshot(all_exchange_data, base_dir, Path(output_file_name).stem)
+        print(f"[INFO] Все результаты топ-10 (включая 30 дней) сохранены в: {output_file_path} (версия {pointer['version']})")
+    except Exception as e:
+        print(f"[ERROR] Ошибка при сохранении общего файла: {e}")
 
-            # Сортировка по 720h (по убыванию)
-            sorted_720h = sorted(data.items(), key=lambda item: item[1].get('720h', 0), reverse=True)
-            top_720h = {item[0]: item[1] for item in sorted_720h[:10]}
 
-        # Возвращаем данные для этой биржи
-        result = {
-            "top_10_by_24h": top_24h,
-            "top_10_by_48h": top_48h,
-            "top_10_by_168h": top_168h,
-            "top_10_by_720h": top_720h
-        }
-        print(f"[SUCCESS] Файл {file_path} обработан.")
-        return exchange_name, result, True
+def main():
+    parser = add_ranking_arguments(argparse.ArgumentParser(description="Топ пар по каждой бирже в result.json"))
+    options = ranking_options(parser.parse_args())
 
-    except FileNotFoundError:
-        print(f"[ERROR] Файл {file_path} не найден.")
-        return exchange_name, None, False
-    except json.JSONDecodeError:
-        print(f"[ERROR] Файл {file_path} повреждён или не является JSON.")
-        return exchange_name, None, False
-    except Exception as e:
-        print(f"[EXCEPTION] Ошибка при обработке {file_path}: {e}")
-        return exchange_name, None, False
-
-async def main():
     # Определяем директорию, где лежат папки бирж
     base_dir = Path(__file__).parent  # Текущая директория (где лежит run_all_top10.py)
-    exchange_dirs = [d for d in base_dir.iterdir() if d.is_dir() and d.name != "common"] # Если есть папка "common", исключим её
-
-    # --- ПОИСК И ОБРАБОТКА ФАЙЛОВ ТОП-10 ---
-    # Ищем файлы, начинающиеся на 'funding_results_'
-    json_files_to_process = []
-    for exchange_dir in exchange_dirs:
-        # Ищем файлы вида funding_results_*.json
-        matching_files = list(exchange_dir.glob("funding_results_*.json"))
-        if matching_files:
-            # Берем первый найденный файл, если их несколько
-            file_path = matching_files[0]
-            json_files_to_process.append(file_path)
-        else:
-            print(f"[WARNING] Файл, начинающийся на 'funding_results_', не найден в {exchange_dir}")
 
-    if not json_files_to_process:
-        print("[WARNING] Не найдено ни одного JSON-файла, начинающегося на 'funding_results_', для обработки.")
+    # Файлы funding_results_<suffix>.json — по профилям бирж (common/profiles.py)
+    all_results = load_all_results(base_dir)
+    if not all_results:
+        print("[WARNING] Не найдено ни одного файла funding_results_*.json для обработки.")
         return
-    else:
-        print(f"[INFO] Найдено {len(json_files_to_process)} JSON-файлов, начинающихся на 'funding_results_', для обработки.")
-
-        # Создаём задачи asyncio
-        tasks = [process_top10_file(file_path) for file_path in json_files_to_process]
-
-        # Используем tqdm.gather для отслеживания прогресса
-        results = await tqdm.gather(*tasks, desc="Обработка JSON-файлов топ-10", total=len(tasks))
-
-        # Собираем результаты и считаем успешные
-        all_exchange_data = {}
-        successful_runs = 0
-        for exchange_name, data, success in results:
-            if success and data is not None:
-                all_exchange_data[exchange_name] = data
-                successful_runs += 1
-            # else: # Если нужно логировать неуспешные, раскомментируйте
-            #     print(f"[SKIP] Данные для {exchange_name} не загружены.")
 
-        total_runs = len(results)
-        print(f"\n[INFO] Все JSON-файлы топ-10 обработаны. Успешно: {successful_runs}/{total_runs}.")
+    all_exchange_data = {exchange_name: build_top10(data, **options) for exchange_name, data in all_results.items()}
+    print(f"\n[INFO] Файлы funding_results обработаны: {len(all_exchange_data)}.")
 
-        # --- СОХРАНЕНИЕ ВСЕХ РЕЗУЛЬТАТОВ В ОДИН ФАЙЛ С УНИКАЛЬНЫМ ИМЕНЕМ ---
-        # Генерируем имя файла с текущей датой и временем
-        # Формат: YYYYMMDD_HHMMSS (например, 20251016_123045)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        # output_file_name = f"top10_all_exchanges_{timestamp}.json"
-        output_file_name = "result.json"
-        output_file_path = base_dir / output_file_name
-        
-        try:
-            with open(output_file_path, "w", encoding="utf-8") as f:
-                json.dump(all_exchange_data, f, indent=4, ensure_ascii=False)
-            print(f"[INFO] Все результаты топ-10 (включая 30 дней) сохранены в: {output_file_path}")
-        except Exception as e:
-            print(f"[ERROR] Ошибка при сохранении общего файла: {e}")
+    save_result(all_exchange_data, base_dir)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    main()
@@ -0,0 +1,50 @@
+# run_arbitrage.py — таблица межбиржевого арбитража фандинга по всем биржам
+import argparse
+from pathlib import Path
+
+from common.arbitrage import (DEFAULT_ARBITRAGE_N, RANK_BY, arbitrage_table, arbitrage_windows, join_by_asset,
+                              print_arbitrage_table)
+from common.publish import publish_snapshot
+from common.ranking import load_all_results
+from common.symbol_registry import SymbolRegistry
+from common.window_agg import parse_windows
+
+def main():
+    parser = argparse.ArgumentParser(description="Лучшие пары long/short между биржами по каждому активу")
+    parser.add_argument("--windows", type=parse_windows, default=None,
+                        help="окна в часах через запятую (по умолчанию — все окна в данных и текущий FR)")
+    parser.add_argument("-n", "--top", type=int, default=DEFAULT_ARBITRAGE_N, help="сколько активов в каждой таблице")
+    parser.add_argument("--by", choices=RANK_BY, default='spread',
+                        help="spread — по спреду FR, profit — по спреду × ёмкости стаканов")
+    parser.add_argument("--min-volume", type=float, default=None,
+                        help="минимальный объём стакана ноги: аски для лонга, биды для шорта")
+    args = parser.parse_args()
+
+    # Определяем директорию, где лежат папки бирж
+    base_dir = Path(__file__).parent
+
+    all_results = load_all_results(base_dir)
+    if not all_results:
+        print("[ERROR] Не найдено ни одного файла funding_results или все файлы пусты/повреждены.")
+        return
+
+    windows = [f"{hours}h" for hours in args.windows] if args.windows else arbitrage_windows(all_results)
+    # Соединение по каноническому активу (реестр символов) строится один раз и используется для всех окон
+    registry = SymbolRegistry.load()
+    by_asset = join_by_asset(all_results, registry)
+    print(f"[INFO] Активов на двух и более биржах: {sum(len(venues) > 1 for venues in by_asset.values())}")
+
+    tables = {}
+    for window in windows:
+        tables[window] = arbitrage_table(all_results, window, args.top, args.by, args.min_volume, by_asset, registry)
+        print_arbitrage_table(f"Арбитраж фандинга ({window}) — топ-{args.top} по {args.by}", tables[window])
+
+    try:
+        # Атомарно, с версионированным снимком и указателем arbitrage.latest.json
+        pointer = publish_snapshot(tables, base_dir, "arbitrage")
+        print(f"\n[INFO] Таблица арбитража сохранена в: {base_dir / 'arbitrage.json'} (версия {pointer['version']})")
+    except Exception as e:
+        print(f"[ERROR] Ошибка при сохранении таблицы арбитража: {e}")
+
+if __name__ == "__main__":
+    main()
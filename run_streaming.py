@@ -0,0 +1,92 @@
+# run_streaming.py — потоковый режим: живые FR и объёмы стакана по WebSocket вместо опроса раз в 10 минут
+import argparse
+import asyncio
+import json
+
+from aiohttp import web
+
+from common.http_session import SESSION_POOL
+from common.profiles import EXCHANGE_PROFILES
+from common.streaming import StreamingEngine
+from common.ws_replay import ReplayServer, block_rest, record_messages, redirect_to
+
+# Как часто сбрасывать живое представление на диск (live_view_<suffix>.json)
+WRITE_INTERVAL_SECONDS = 10
+
+
+async def write_periodically(engines, interval):
+    while True:
+        await asyncio.sleep(interval)
+        for engine in engines:
+            engine.live_view.save(engine.live_view_path)
+
+
+async def serve(engines, port):
+    """HTTP по запросу: GET /live — все биржи, GET /live/<папка биржи> — одна."""
+    by_folder = {engine.profile.folder: engine for engine in engines}
+
+    async def live_all(request):
+        return web.json_response({folder: engine.live_view.snapshot() for folder, engine in by_folder.items()},
+                                 dumps=lambda data: json.dumps(data, ensure_ascii=False))
+
+    async def live_one(request):
+        engine = by_folder.get(request.match_info['exchange'])
+        if engine is None:
+            return web.json_response({'error': 'Биржа не найдена'}, status=404)
+        return web.json_response(engine.live_view.snapshot(), dumps=lambda data: json.dumps(data, ensure_ascii=False))
+
+    app = web.Application()
+    app.router.add_get('/live', live_all)
+    app.router.add_get('/live/{exchange}', live_one)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, '0.0.0.0', port).start()
+    print(f"Живое представление доступно на http://0.0.0.0:{port}/live")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Потоковый сбор FR и стакана по WebSocket")
+    parser.add_argument("--exchange", action="append", choices=sorted(EXCHANGE_PROFILES),
+                        help="Папка биржи (можно несколько раз); по умолчанию все")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Отдавать живое представление по HTTP на этом порту")
+    parser.add_argument("--write-interval", type=float, default=WRITE_INTERVAL_SECONDS,
+                        help="Период записи live_view_<биржа>.json, секунд")
+    parser.add_argument("--record", metavar="FILE", help="Записывать входящие WebSocket-сообщения в JSONL (одна биржа)")
+    parser.add_argument("--replay", metavar="FILE", help="Воспроизвести записанные сообщения с локального сервера вместо биржи (одна биржа)")
+    args = parser.parse_args()
+
+    folders = args.exchange or sorted(EXCHANGE_PROFILES)
+    if (args.record or args.replay) and len(folders) != 1:
+        parser.error("--record и --replay работают с одной биржей (--exchange)")
+
+    engines = [StreamingEngine(EXCHANGE_PROFILES[folder], replay=bool(args.replay)) for folder in folders]
+
+    replay_server = None
+    if args.replay:
+        replay_server = ReplayServer(args.replay)
+        await replay_server.start()
+        redirect_to(engines[0].exchange, replay_server.url)
+        block_rest(engines[0].exchange)
+    if args.record:
+        record_messages(engines[0].exchange, args.record)
+
+    tasks = [engine.run() for engine in engines]
+    tasks.append(write_periodically(engines, args.write_interval))
+    if args.serve:
+        await serve(engines, args.serve)
+
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for engine in engines:
+            engine.live_view.save(engine.live_view_path)
+        await SESSION_POOL.close()
+        if replay_server is not None:
+            await replay_server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Потоковый режим остановлен.")
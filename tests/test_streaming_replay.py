@@ -0,0 +1,137 @@
+# test_streaming_replay.py — потоковый режим на записанных сообщениях: локальная подмена биржи, без сети
+
+import asyncio
+import dataclasses
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from common import profiles
+from common.engine import book_volumes
+from common.streaming import StreamingEngine
+from common.ws_replay import ReplayServer, block_rest, redirect_to
+
+BTC_MARKET = {
+    'symbol': 'BTC/USDT:USDT', 'base': 'BTC', 'quote': 'USDT', 'settle': 'USDT',
+    'baseId': 'BTC', 'quoteId': 'USDT', 'settleId': 'USDT',
+    'type': 'swap', 'spot': False, 'margin': False, 'swap': True, 'future': False, 'option': False,
+    'contract': True, 'linear': True, 'inverse': False, 'contractSize': 1, 'active': True,
+    'precision': {'amount': 0.001, 'price': 0.1}, 'limits': {}, 'info': {},
+}
+
+# Bybit: снимок стакана и две дельты (объём '0' — уровень удалён)
+BYBIT_FRAMES = [
+    {'topic': 'orderbook.50.BTCUSDT', 'type': 'snapshot', 'ts': 1700000000000, 'cts': 1700000000000,
+     'data': {'s': 'BTCUSDT', 'u': 1, 'seq': 1,
+              'b': [[str(100 - i), str(i + 1)] for i in range(7)],
+              'a': [[str(101 + i), str(2 * i + 1)] for i in range(7)]}},
+    {'topic': 'orderbook.50.BTCUSDT', 'type': 'delta', 'ts': 1700000000100, 'cts': 1700000000100,
+     'data': {'s': 'BTCUSDT', 'u': 2, 'seq': 2, 'b': [['99', '0'], ['100', '4']], 'a': [['101.5', '3']]}},
+    {'topic': 'orderbook.50.BTCUSDT', 'type': 'delta', 'ts': 1700000000200, 'cts': 1700000000200,
+     'data': {'s': 'BTCUSDT', 'u': 3, 'seq': 3, 'b': [['98', '10']], 'a': [['102', '0']]}},
+]
+
+# MEXC: канал funding rate (поток стакана MEXC требует REST-снимка, поэтому здесь только FR)
+MEXC_FRAMES = [
+    {'channel': 'push.funding.rate', 'symbol': 'BTC_USDT', 'ts': 1700000000000,
+     'data': {'symbol': 'BTC_USDT', 'rate': 0.0001}},
+    {'channel': 'push.funding.rate', 'symbol': 'BTC_USDT', 'ts': 1700000060000,
+     'data': {'symbol': 'BTC_USDT', 'rate': -0.000213}},
+]
+
+
+def replay_bybit_book(frames):
+    """Стакан после записанных кадров Bybit, собранный независимо от ccxt: {'bids': [[цена, объём]], 'asks': ...}."""
+    sides = {'b': {}, 'a': {}}
+    for frame in frames:
+        if frame['type'] == 'snapshot':
+            sides = {'b': {}, 'a': {}}
+        for side, levels in sides.items():
+            for price, amount in frame['data'][side]:
+                if float(amount):
+                    levels[float(price)] = float(amount)
+                else:
+                    levels.pop(float(price), None)
+    return {
+        'bids': sorted(([price, amount] for price, amount in sides['b'].items()), reverse=True),
+        'asks': sorted([price, amount] for price, amount in sides['a'].items()),
+    }
+
+
+class StreamingReplayTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.original_base_dir = profiles.BASE_DIR
+        profiles.BASE_DIR = self.base_dir
+
+    def tearDown(self):
+        profiles.BASE_DIR = self.original_base_dir
+
+    def prepare(self, profile_key: str, market_id: str, frames: list):
+        """Профиль без предфильтра, список символов, кэш рынков (заведомо устаревший) и файл записи."""
+        profile = profiles.EXCHANGE_PROFILES[profile_key]
+        data_dir = Path(self.base_dir) / profile.folder
+        data_dir.mkdir()
+        (data_dir / profile.pairs_file).write_text(json.dumps(['BTC/USDT:USDT']), encoding='utf-8')
+        markets = {'BTC/USDT:USDT': {**BTC_MARKET, 'id': market_id}}
+        (data_dir / f"markets_cache_{profile.file_suffix}.json").write_text(
+            json.dumps({'saved_at': 0, 'markets': markets, 'currencies': {}}), encoding='utf-8')
+        recording = data_dir / 'recording.jsonl'
+        recording.write_text(''.join(json.dumps(frame) + '\n' for frame in frames), encoding='utf-8')
+        return profile, recording
+
+    async def replay(self, profile, recording):
+        """Воспроизводит запись через локальный WebSocket-сервер и возвращает (движок, число REST-попыток)."""
+        server = ReplayServer(recording, delay=0.01)
+        await server.start()
+        engine = StreamingEngine(profile, replay=True)
+        redirect_to(engine.exchange, server.url)
+        block_rest(engine.exchange)
+        blocked_fetch = engine.exchange.fetch
+        rest_calls = []
+
+        async def counting_fetch(url, *args, **kwargs):
+            rest_calls.append(url)
+            return await blocked_fetch(url, *args, **kwargs)
+
+        engine.exchange.fetch = counting_fetch
+        task = asyncio.create_task(engine.run())
+        try:
+            await asyncio.wait_for(server.finished.wait(), timeout=10)
+            await asyncio.sleep(0.2)  # Последнее сообщение ещё обрабатывается клиентом
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await server.stop()
+        return engine, rest_calls
+
+    async def test_book_aggregates_match_recorded_frames(self):
+        profile, recording = self.prepare('Bybite', 'BTCUSDT', BYBIT_FRAMES)
+        engine, rest_calls = await self.replay(dataclasses.replace(profile, stream_order_book_limit=50), recording)
+
+        ask_total, bid_total = book_volumes(replay_bybit_book(BYBIT_FRAMES), profile.order_book_levels)
+        entry = engine.live_view.snapshot()['BTC/USDT:USDT']
+        self.assertEqual(entry['askTotalVolume'], round(ask_total, 2))
+        self.assertEqual(entry['bidTotalVolume'], round(bid_total, 2))
+        self.assertEqual(rest_calls, [])
+
+        # То же попадает в live_view_<suffix>.json
+        engine.live_view.save(engine.live_view_path)
+        with open(engine.live_view_path, "r", encoding="utf-8") as f:
+            saved = json.load(f)['BTC/USDT:USDT']
+        self.assertEqual((saved['askTotalVolume'], saved['bidTotalVolume']), (round(ask_total, 2), round(bid_total, 2)))
+
+    async def test_funding_matches_last_recorded_frame(self):
+        profile, recording = self.prepare('MexC', 'BTC_USDT', MEXC_FRAMES)
+        engine, rest_calls = await self.replay(profile, recording)
+        self.assertEqual(rest_calls, [])
+
+        last = MEXC_FRAMES[-1]['data']
+        entry = engine.live_view.snapshot()['BTC/USDT:USDT']
+        self.assertEqual(entry['currentFR'], round(last['rate'] * 100, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
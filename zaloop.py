@@ -1,15 +1,20 @@
 import subprocess
-import shutil
 import time
 import logging
 import sys
 from pathlib import Path
 
+from common.publish import atomic_copy
+
 # --- Настройки ---
 # Укажите пути к вашим Python-скриптам
 SCRIPT1_PATH = "run_all_exchanges.py"
 SCRIPT2_PATH = "run_all_top10.py"
 
+# True — биржи опрашиваются в одном процессе, и run_all_exchanges.py сам считает топ-10 по результатам в памяти.
+# False — каждая биржа в отдельном процессе (изоляция), топ-10 считается вторым скриптом по файлам.
+IN_PROCESS = True
+
 # Укажите путь к результирующему JSON файлу (ожидается, что он создается вторым скриптом)
 RESULT_JSON_PATH = "result.json"
 
@@ -30,13 +35,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def run_script(script_path):
+def run_script(script_path, *args):
     """Запускает Python-скрипт и ожидает его завершения."""
     logger.info(f"Запуск скрипта: {script_path}")
     try:
         # Запуск скрипта через subprocess.run с ожиданием завершения (по умолчанию)
         # stderr=subprocess.PIPE позволяет захватить ошибки, если нужно их обрабатывать
-        result = subprocess.run([sys.executable, script_path], 
+        result = subprocess.run([sys.executable, script_path, *args], 
                                 capture_output=True, text=True, check=True)
         logger.info(f"Скрипт успешно завершен: {script_path}")
         # Если нужно, можно логировать stdout/stderr
@@ -51,7 +56,7 @@ def run_script(script_path):
         raise
 
 def copy_json_file(src_path, dest_folder):
-    """Копирует JSON файл из исходной папки в целевую."""
+    """Копирует JSON файл из исходной папки в целевую (атомарно: dev-сервер не увидит недописанный файл)."""
     src_file = Path(src_path)
     dest_dir = Path(dest_folder)
 
@@ -69,7 +74,7 @@ def copy_json_file(src_path, dest_folder):
         
         # Копируем файл, используя имя из исходного пути
         destination_file = dest_dir / src_file.name
-        shutil.copy2(src_file, destination_file) # copy2 сохраняет метаданные
+        atomic_copy(src_file, destination_file) # временный файл + rename, метаданные сохраняются
         logger.info(f"JSON файл скопирован: {src_path} -> {destination_file}")
     except Exception as e:
         logger.error(f"Ошибка при копировании файла {src_path} в {dest_folder}: {e}")
@@ -80,11 +85,15 @@ def main():
     logger.info("Запуск автоматизированного процесса.")
     while True:
         try:
-            # 1. Запуск первого скрипта
-            run_script(SCRIPT1_PATH)
-            
-            # 2. Запуск второго скрипта
-            run_script(SCRIPT2_PATH)
+            if IN_PROCESS:
+                # 1-2. Сбор данных и топ-10 в одном процессе
+                run_script(SCRIPT1_PATH)
+            else:
+                # 1. Запуск первого скрипта
+                run_script(SCRIPT1_PATH, "--subprocess")
+
+                # 2. Запуск второго скрипта
+                run_script(SCRIPT2_PATH)
 
             # 3. Копирование результирующего JSON файла
             copy_json_file(RESULT_JSON_PATH, DESTINATION_FOLDER)